@@ -0,0 +1,203 @@
+""" Synthetic GData v2 responses, shaped like the ones youtube returns, for
+    benchmarking pytube without talking to youtube.
+"""
+import datetime
+
+SCHEMA = 'http://gdata.youtube.com/schemas/2007'
+BASE_URL = 'http://gdata.youtube.com'
+
+
+def timestamp(i):
+    dt = datetime.datetime(2011, 1, 1) + datetime.timedelta(minutes=97 * i)
+    return dt.strftime('%Y-%m-%dT%H:%M:%S') + '.%03dZ' % (i % 1000)
+
+
+def video_id(i):
+    return 'v%010d' % i
+
+
+def video_entry(i, base_url=BASE_URL):
+    vid = video_id(i)
+    entry = {
+        u'id': {u'$t': u'tag:youtube.com,2008:video:' + vid},
+        u'published': {u'$t': timestamp(i)},
+        u'updated': {u'$t': timestamp(i + 1)},
+        u'category': [
+            {u'scheme': u'http://schemas.google.com/g/2005#kind',
+             u'term': SCHEMA + u'#video'},
+            {u'scheme': SCHEMA + u'/categories.cat',
+             u'term': u'Music', u'label': u'Music'},
+            {u'scheme': SCHEMA + u'/keywords.cat', u'term': u'keyword%d' % (i % 50)},
+            {u'scheme': SCHEMA + u'/keywords.cat', u'term': u'keyword%d' % (i % 7)},
+        ],
+        u'title': {u'$t': u'Synthetic video number %d' % i, u'type': u'text'},
+        u'content': {u'type': u'application/x-shockwave-flash',
+                     u'src': u'http://www.youtube.com/v/%s?f=videos&app=youtube_gdata' % vid},
+        u'link': [
+            {u'rel': u'alternate', u'type': u'text/html',
+             u'href': u'http://www.youtube.com/watch?v=%s&feature=youtube_gdata' % vid},
+            {u'rel': SCHEMA + u'#video.responses', u'type': u'application/atom+xml',
+             u'href': base_url + u'/feeds/api/videos/%s/responses?v=2' % vid},
+            {u'rel': SCHEMA + u'#video.related', u'type': u'application/atom+xml',
+             u'href': base_url + u'/feeds/api/videos/%s/related?v=2' % vid},
+            {u'rel': u'self', u'type': u'application/atom+xml',
+             u'href': base_url + u'/feeds/api/videos/%s?v=2' % vid},
+        ],
+        u'author': [{u'name': {u'$t': u'channel%d' % (i % 20)},
+                     u'uri': {u'$t': base_url + u'/feeds/api/users/channel%d' % (i % 20)}}],
+        u'yt$accessControl': [
+            {u'action': action, u'permission': u'allowed'}
+            for action in (u'comment', u'commentVote', u'videoRespond',
+                           u'rate', u'embed', u'list', u'syndicate')
+        ],
+        u'gd$comments': {u'gd$feedLink': {
+            u'rel': SCHEMA + u'#comments', u'countHint': i % 300,
+            u'href': base_url + u'/feeds/api/videos/%s/comments?v=2' % vid}},
+        u'media$group': {
+            u'media$category': [{u'$t': u'Music', u'label': u'Music',
+                                 u'scheme': SCHEMA + u'/categories.cat'}],
+            u'media$content': [{u'url': u'http://www.youtube.com/v/%s' % vid,
+                                u'type': u'application/x-shockwave-flash',
+                                u'medium': u'video', u'isDefault': u'true',
+                                u'expression': u'full', u'duration': 60 + i % 600,
+                                u'yt$format': 5}],
+            u'media$credit': [{u'$t': u'channel%d' % (i % 20), u'role': u'uploader',
+                               u'scheme': u'urn:youtube'}],
+            u'media$description': {u'$t': u'A description of synthetic video %d. ' % i * 4,
+                                   u'type': u'plain'},
+            u'media$keywords': {},
+            u'media$player': {u'url': u'http://www.youtube.com/watch?v=%s' % vid},
+            u'media$thumbnail': [{u'url': u'http://i.ytimg.com/vi/%s/%d.jpg' % (vid, n),
+                                  u'height': 90, u'width': 120,
+                                  u'time': u'00:00:%02d' % n, u'yt$name': u'start'}
+                                 for n in range(4)],
+            u'media$title': {u'$t': u'Synthetic video number %d' % i, u'type': u'plain'},
+            u'yt$aspectRatio': {u'$t': u'widescreen'},
+            u'yt$duration': {u'seconds': unicode(60 + i % 600)},
+            u'yt$uploaded': {u'$t': timestamp(i)},
+            u'yt$videoid': {u'$t': vid},
+        },
+        u'gd$rating': {u'average': 4.5, u'max': 5, u'min': 1,
+                       u'numRaters': 10 + i % 1000, u'rel': u'http://schemas.google.com/g/2005#overall'},
+        u'yt$rating': {u'numLikes': unicode(5 + i % 900), u'numDislikes': unicode(i % 40)},
+        u'yt$statistics': {u'favoriteCount': unicode(i % 100), u'viewCount': unicode(1000 + 37 * i)},
+    }
+    if i % 25 == 24:
+        # restricted videos don't expose their statistics
+        del entry[u'yt$statistics']
+        del entry[u'yt$rating']
+    return entry
+
+
+def video_jsonc_item(i):
+    vid = video_id(i)
+    return {
+        u'id': vid,
+        u'uploaded': timestamp(i),
+        u'updated': timestamp(i + 1),
+        u'uploader': u'channel%d' % (i % 20),
+        u'category': u'Music',
+        u'title': u'Synthetic video number %d' % i,
+        u'description': u'A description of synthetic video %d. ' % i * 4,
+        u'tags': [u'keyword%d' % (i % 50), u'keyword%d' % (i % 7)],
+        u'thumbnail': {u'sqDefault': u'http://i.ytimg.com/vi/%s/default.jpg' % vid,
+                       u'hqDefault': u'http://i.ytimg.com/vi/%s/hqdefault.jpg' % vid},
+        u'player': {u'default': u'http://www.youtube.com/watch?v=%s' % vid},
+        u'content': {u'5': u'http://www.youtube.com/v/%s' % vid},
+        u'duration': 60 + i % 600,
+        u'aspectRatio': u'widescreen',
+        u'rating': 4.5,
+        u'likeCount': unicode(5 + i % 900),
+        u'ratingCount': 5 + i % 900 + i % 40,
+        u'viewCount': 1000 + 37 * i,
+        u'favoriteCount': i % 100,
+        u'commentCount': i % 300,
+        u'accessControl': {u'comment': u'allowed', u'rate': u'allowed', u'embed': u'allowed'},
+    }
+
+
+def comment_entry(video_index, i):
+    return {
+        u'id': {u'$t': u'tag:youtube.com,2008:video:%s:comment:C%08d' % (video_id(video_index), i)},
+        u'published': {u'$t': timestamp(i)},
+        u'updated': {u'$t': timestamp(i)},
+        u'title': {u'$t': u'Comment %d' % i},
+        u'content': {u'$t': u'This is synthetic comment number %d.' % i},
+        u'author': [{u'name': {u'$t': u'commenter%d' % (i % 500)}}],
+    }
+
+
+def playlist_entry(playlist_id, i, base_url=BASE_URL):
+    entry = video_entry(i, base_url)
+    del entry[u'published']
+    entry[u'id'] = {u'$t': u'tag:youtube.com,2008:playlist:%s:E%010d' % (playlist_id, i)}
+    entry[u'yt$position'] = {u'$t': i + 1}
+    return entry
+
+
+def profile(username, base_url=BASE_URL):
+    feed_links = [
+        {u'rel': SCHEMA + u'#user.' + name, u'href': base_url + u'/feeds/api/users/%s/%s' % (username, name),
+         u'countHint': 10}
+        for name in (u'favorites', u'contacts', u'playlists', u'subscriptions', u'uploads')
+    ]
+    return {
+        u'version': u'1.0',
+        u'encoding': u'UTF-8',
+        u'entry': {
+            u'id': {u'$t': u'tag:youtube.com,2008:user:' + username},
+            u'updated': {u'$t': timestamp(1)},
+            u'title': {u'$t': username},
+            u'author': [{u'name': {u'$t': username}}],
+            u'link': [{u'rel': u'self', u'href': base_url + u'/feeds/api/users/' + username}],
+            u'media$thumbnail': {u'url': u'http://i.ytimg.com/i/%s/1.jpg' % username},
+            u'yt$username': {u'$t': username},
+            u'yt$age': {u'$t': 30},
+            u'yt$location': {u'$t': u'US'},
+            u'yt$statistics': {u'lastWebAccess': timestamp(2), u'subscriberCount': u'1234',
+                               u'totalUploadViews': u'100000', u'videoWatchCount': 0,
+                               u'viewCount': u'5000'},
+            u'gd$feedLink': feed_links,
+        },
+    }
+
+
+def subscription_entry(i):
+    return {
+        u'id': {u'$t': u'tag:youtube.com,2008:user:me:subscription:S%08d' % i},
+        u'updated': {u'$t': timestamp(i)},
+        u'yt$username': {u'$t': u'channel%d' % i},
+    }
+
+
+def feed(entries, total, start_index=1, title=u'Synthetic feed', base_url=BASE_URL):
+    """ Wraps entries in an alt=json feed """
+    return {
+        u'version': u'1.0',
+        u'encoding': u'UTF-8',
+        u'feed': {
+            u'id': {u'$t': base_url + u'/feeds/api/videos'},
+            u'updated': {u'$t': timestamp(0)},
+            u'title': {u'$t': title},
+            u'link': [{u'rel': u'self', u'type': u'application/atom+xml',
+                       u'href': base_url + u'/feeds/api/videos?v=2'}],
+            u'openSearch$totalResults': {u'$t': total},
+            u'openSearch$startIndex': {u'$t': start_index},
+            u'openSearch$itemsPerPage': {u'$t': len(entries)},
+            u'entry': entries,
+        },
+    }
+
+
+def jsonc_feed(items, total, start_index=1):
+    """ Wraps items in an alt=jsonc feed """
+    return {
+        u'apiVersion': u'2.1',
+        u'data': {
+            u'updated': timestamp(0),
+            u'totalItems': total,
+            u'startIndex': start_index,
+            u'itemsPerPage': len(items),
+            u'items': items,
+        },
+    }
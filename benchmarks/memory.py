@@ -0,0 +1,92 @@
+""" Measures how many bytes pytube's model objects take per instance.
+
+    The slotted layout is compared against the same objects laid out the
+    way they used to be: attributes in a per-instance __dict__, and a private
+    copy of every string and Category.
+
+    Run from the repository root:  python -m benchmarks.memory [count]
+"""
+import json
+import sys
+
+from pytube.client import Client, Video, Comment
+from benchmarks import feeds
+
+
+def deep_size(obj, seen):
+    """ The size of obj and everything it references that isn't in seen """
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.iteritems())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_size(item, seen) for item in obj)
+    if hasattr(obj, '__dict__'):
+        size += deep_size(obj.__dict__, seen)
+    for cls in type(obj).__mro__:
+        for name in cls.__dict__.get('__slots__', ()):
+            try:
+                size += deep_size(cls.__dict__[name].__get__(obj, cls), seen)
+            except AttributeError:
+                pass
+    return size
+
+
+class DictLayout(object):
+    """ Stands in for a model object that keeps its attributes in a __dict__ """
+
+
+def copy_value(value):
+    if isinstance(value, unicode):
+        return u''.join(list(value)) if value else u''
+    if isinstance(value, str):
+        copy = type(value)(''.join(list(value)))
+        if hasattr(value, 'label'):
+            copy.label = value.label
+        return copy
+    if isinstance(value, list):
+        return [copy_value(v) for v in value]
+    if isinstance(value, dict):
+        return dict((copy_value(k), copy_value(v)) for k, v in value.iteritems())
+    return value
+
+
+def as_dict_layout(obj):
+    copy = DictLayout()
+    state = obj.__getstate__()
+    for name, value in state.iteritems():
+        setattr(copy, name, copy_value(value))
+    return copy
+
+
+def bytes_per_object(objects, exclude):
+    seen = set(id(o) for o in exclude)
+    return deep_size(objects, seen) / float(len(objects))
+
+
+def main(count=2000):
+    client = Client('pytube-benchmarks')
+    entries = [json.loads(json.dumps(feeds.video_entry(i))) for i in xrange(count)]
+    comment_entries = [json.loads(json.dumps(feeds.comment_entry(0, i))) for i in xrange(count)]
+
+    videos = [Video(client, entry) for entry in entries]
+    comments = [Comment(entry) for entry in comment_entries]
+    lazy_videos = [Video(client, entry, lazy=True) for entry in entries]
+
+    results = {
+        'video_slots': bytes_per_object(videos, [client]),
+        'video_dict': bytes_per_object([as_dict_layout(v) for v in videos], [client]),
+        'comment_slots': bytes_per_object(comments, []),
+        'comment_dict': bytes_per_object([as_dict_layout(c) for c in comments], []),
+        # lazy videos still hold on to their raw entries
+        'video_lazy_undecoded': bytes_per_object(lazy_videos, [client]),
+    }
+    for name in sorted(results):
+        print '%-22s %10.0f bytes/object' % (name, results[name])
+    return results
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
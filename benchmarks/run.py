@@ -0,0 +1,176 @@
+""" Runs pytube's benchmark suite against a local GData stand-in server and
+    writes the results as JSON, so they can be compared between revisions.
+
+    Run from the repository root:
+
+        python -m benchmarks.run [--latency 0.01] [--page-size 50] [--output results.json]
+        python -m benchmarks.run --baseline results.json [--tolerance 0.1]
+
+    With --baseline, every result is compared against an earlier run and the
+    exit status is 1 if any of them got worse by more than the tolerance.
+"""
+try: import simplejson as json
+except ImportError: import json
+import optparse
+import platform
+import sys
+import time
+
+from pytube.client import Client, Comment, Video, VideoStream
+from pytube.stream import Stream
+from benchmarks import feeds, memory
+from benchmarks.server import GDataServer
+
+
+def timed(func, repeat=3):
+    """ The best of `repeat` wall clock timings of func() """
+    best = None
+    for _ in xrange(repeat):
+        started = time.time()
+        func()
+        elapsed = time.time() - started
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def percentile(values, percent):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100.0))]
+
+
+def stream_throughput(server, make_stream):
+    """ Objects per second when iterating a fresh stream to its end """
+    count = [0]
+    def iterate():
+        count[0] = sum(1 for _ in make_stream(server.client()))
+    seconds = timed(iterate)
+    return count[0] / seconds
+
+
+def video_init_json(count):
+    """ Microseconds spent building a Video from an API entry """
+    client = Client('pytube-benchmarks')
+    entries = [json.loads(json.dumps(feeds.video_entry(i))) for i in xrange(count)]
+    seconds = timed(lambda: [Video(client, entry) for entry in entries])
+    return seconds * 1e6 / count
+
+
+def video_latency(server, count):
+    """ Milliseconds per Client.video call: mean, median and 95th percentile """
+    client = server.client()
+    client.video(feeds.video_id(0))   # open a connection
+    latencies = []
+    for i in xrange(count):
+        started = time.time()
+        client.video(feeds.video_id(i))
+        latencies.append((time.time() - started) * 1000)
+    return sum(latencies) / len(latencies), percentile(latencies, 50), percentile(latencies, 95)
+
+
+def memory_per_object(count):
+    client = Client('pytube-benchmarks')
+    entries = [json.loads(json.dumps(feeds.video_entry(i))) for i in xrange(count)]
+    comment_entries = [json.loads(json.dumps(feeds.comment_entry(0, i))) for i in xrange(count)]
+    return (memory.bytes_per_object([Video(client, entry) for entry in entries], [client]),
+            memory.bytes_per_object([Comment(entry) for entry in comment_entries], []))
+
+
+def run(latency=0, page_size=50, total=500, count=200):
+    server = GDataServer(latency=latency, page_size=page_size, total=total).start()
+    default_page_size = Stream.MAX_PAGE_SIZE
+    # streams stop at the first short page, so they must ask for no more
+    # than the server hands out
+    Stream.MAX_PAGE_SIZE = min(page_size, default_page_size)
+    try:
+        results = {}
+        results['stream_videos_per_second'] = stream_throughput(
+            server, lambda c: c.user_videos('channel0'))
+        results['stream_jsonc_videos_per_second'] = stream_throughput(
+            server, lambda c: c.user_videos('channel0', format='jsonc'))
+        results['stream_incremental_videos_per_second'] = stream_throughput(
+            server, lambda c: VideoStream(c, c.YOUTUBE_UPLOADS_URL % {'username': 'channel0'},
+                                          incremental=True))
+        results['stream_comments_per_second'] = stream_throughput(
+            server, lambda c: c.video_comments(feeds.video_id(0)))
+        results['stream_subscriptions_per_second'] = stream_throughput(
+            server, lambda c: c.user_subscriptions('channel0'))
+        results['video_init_json_us'] = video_init_json(count)
+        (results['video_latency_mean_ms'], results['video_latency_p50_ms'],
+         results['video_latency_p95_ms']) = video_latency(server, count)
+        results['profile_ms'] = timed(lambda: server.client().user_profile('channel0')) * 1000
+        results['playlist_ms'] = timed(lambda: server.client().playlist('PL0')) * 1000
+        results['video_bytes_per_object'], results['comment_bytes_per_object'] = memory_per_object(count)
+    finally:
+        Stream.MAX_PAGE_SIZE = default_page_size
+        server.stop()
+    return results
+
+
+def higher_is_better(name):
+    return name.endswith('_per_second')
+
+
+def compare(results, baseline, tolerance):
+    """ Returns the names of the results that regressed against baseline """
+    regressions = []
+    for name, value in sorted(results.iteritems()):
+        old = baseline.get(name)
+        if not old:
+            continue
+        change = (value - old) / float(old)
+        if higher_is_better(name):
+            change = -change
+        if change > tolerance:
+            regressions.append(name)
+        print >> sys.stderr, '%-40s %12.2f %12.2f %+7.1f%%%s' % (
+            name, old, value, 100 * change, '  REGRESSED' if change > tolerance else '')
+    return regressions
+
+
+def main(argv=None):
+    parser = optparse.OptionParser(usage='python -m benchmarks.run [options]')
+    parser.add_option('--latency', type='float', default=0,
+                      help='seconds the server waits before answering each request')
+    parser.add_option('--page-size', type='int', default=50,
+                      help='most entries per page the server returns')
+    parser.add_option('--total', type='int', default=500, help='entries in every feed')
+    parser.add_option('--count', type='int', default=200,
+                      help='videos to build, look up and measure')
+    parser.add_option('--output', help='write the results here instead of to stdout')
+    parser.add_option('--baseline', help='results of an earlier run to compare against')
+    parser.add_option('--tolerance', type='float', default=0.1,
+                      help='how much worse (0.1 is 10%%) a result may get')
+    options, args = parser.parse_args(argv)
+
+    config = {
+        'latency': options.latency,
+        'page_size': options.page_size,
+        'total': options.total,
+        'count': options.count,
+    }
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': config,
+        'results': run(**config),
+    }
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if options.output:
+        with open(options.output, 'w') as fp:
+            fp.write(output + '\n')
+    else:
+        print output
+
+    if options.baseline:
+        with open(options.baseline) as fp:
+            baseline = json.load(fp)
+        if baseline.get('config') != config:
+            print >> sys.stderr, 'warning: the baseline was run with %r' % (baseline.get('config'),)
+        if compare(report['results'], baseline['results'], options.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,63 @@
+""" Compares pytube's binary records against pickle and JSON, by size and
+    by the time it takes to write and read back a batch of videos.
+
+    Run from the repository root:  python -m benchmarks.serialization [count]
+"""
+try: import simplejson as json
+except ImportError: import json
+import cPickle as pickle
+import StringIO
+import sys
+import timeit
+
+from pytube import serialize
+from pytube.client import Client, Video
+from benchmarks import feeds
+
+
+def pytube_records(client, videos):
+    buf = StringIO.StringIO()
+    serialize.RecordWriter(buf).write_all(videos)
+    data = buf.getvalue()
+    return data, lambda: list(serialize.RecordReader(StringIO.StringIO(data), client))
+
+
+def pickled(client, videos):
+    data = pickle.dumps(videos, pickle.HIGHEST_PROTOCOL)
+    return data, lambda: pickle.loads(data)
+
+
+def raw_json(client, entries):
+    # keeping the raw API entries around, and building videos from them
+    data = json.dumps(entries)
+    return data, lambda: [Video(client, entry) for entry in json.loads(data)]
+
+
+def main(count=1000):
+    client = Client('pytube-benchmarks')
+    entries = [json.loads(json.dumps(feeds.video_entry(i))) for i in xrange(count)]
+    videos = [Video(client, entry) for entry in entries]
+
+    cases = [
+        ('pytube records', pytube_records, videos),
+        ('pickle', pickled, videos),
+        ('raw json', raw_json, entries),
+    ]
+    results = {}
+    for name, dump, objs in cases:
+        dump_seconds = min(timeit.repeat(lambda: dump(client, objs), number=1, repeat=3))
+        data, load = dump(client, objs)
+        load_seconds = min(timeit.repeat(load, number=1, repeat=3))
+        results[name] = {
+            'bytes_per_object': len(data) / float(count),
+            'dump_us_per_object': dump_seconds * 1e6 / count,
+            'load_us_per_object': load_seconds * 1e6 / count,
+        }
+        print '%-16s %8.0f bytes  %8.1f us dump  %8.1f us load  (per object)' % (
+            name, results[name]['bytes_per_object'],
+            results[name]['dump_us_per_object'], results[name]['load_us_per_object'])
+    return results
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,179 @@
+""" A local stand-in for the GData API, serving the synthetic feeds from
+    benchmarks.feeds so pytube can be benchmarked without talking to
+    youtube.
+
+    Run it on its own to point something else at it:
+
+        python -m benchmarks.server [port]
+"""
+try: import simplejson as json
+except ImportError: import json
+import BaseHTTPServer
+import re
+import SocketServer
+import sys
+import threading
+import time
+import urlparse
+
+from pytube.client import Client
+from benchmarks import feeds
+
+VIDEO_ID = re.compile(r'^v(\d+)$')
+
+
+class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # send each response in as few packets as possible, and right away
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    # (pattern, method name) pairs, tried in order
+    routes = (
+        (re.compile(r'^/feeds/api/videos/(?P<video_id>[^/]+)/comments$'), 'comments'),
+        (re.compile(r'^/feeds/api/videos/(?P<video_id>[^/]+)/(related|responses)$'), 'videos'),
+        (re.compile(r'^/feeds/api/videos/(?P<video_id>[^/]+)$'), 'video'),
+        (re.compile(r'^/feeds/api/videos/?$'), 'videos'),
+        (re.compile(r'^/feeds/api/users/(?P<username>[^/]+)/uploads$'), 'videos'),
+        (re.compile(r'^/feeds/api/users/(?P<username>[^/]+)/subscriptions$'), 'subscriptions'),
+        (re.compile(r'^/feeds/api/users/(?P<username>[^/]+)$'), 'profile'),
+        (re.compile(r'^/feeds/api/playlists/(?P<playlist_id>[^/]+)$'), 'playlist'),
+    )
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        server.count_request()
+        if server.latency:
+            time.sleep(server.latency)
+        url = urlparse.urlparse(self.path)
+        query = dict(urlparse.parse_qsl(url.query))
+        for pattern, name in self.routes:
+            match = pattern.match(url.path)
+            if match:
+                break
+        else:
+            return self.respond(404, 'Not found')
+        key = (name, url.path, tuple(sorted(query.items())))
+        body = server.rendered.get(key)
+        if body is None:
+            data = getattr(self, name)(query, **match.groupdict())
+            if data is None:
+                return self.respond(404, 'Not found')
+            body = server.rendered[key] = json.dumps(data)
+        self.respond(200, body, 'application/json; charset=UTF-8')
+
+    def respond(self, status, body, content_type='text/plain'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def page(self, query):
+        """ Returns the range of (0-based) indexes a feed request asks for """
+        start = int(query.get('start-index', 1))
+        size = min(int(query.get('max-results', 25)), self.server.page_size)
+        stop = min(start - 1 + size, self.server.total)
+        return start, xrange(start - 1, stop)
+
+    def video(self, query, video_id):
+        match = VIDEO_ID.match(video_id)
+        if not match:
+            return None
+        return {u'version': u'1.0', u'encoding': u'UTF-8',
+                u'entry': feeds.video_entry(int(match.group(1)), self.server.base_url)}
+
+    def videos(self, query, **kwargs):
+        start, indexes = self.page(query)
+        if query.get('alt') == 'jsonc':
+            return feeds.jsonc_feed([feeds.video_jsonc_item(i) for i in indexes],
+                                    self.server.total, start)
+        return feeds.feed([feeds.video_entry(i, self.server.base_url) for i in indexes],
+                          self.server.total, start, base_url=self.server.base_url)
+
+    def comments(self, query, video_id):
+        start, indexes = self.page(query)
+        return feeds.feed([feeds.comment_entry(0, i) for i in indexes],
+                          self.server.total, start, base_url=self.server.base_url)
+
+    def subscriptions(self, query, username):
+        start, indexes = self.page(query)
+        return feeds.feed([feeds.subscription_entry(i) for i in indexes],
+                          self.server.total, start, base_url=self.server.base_url)
+
+    def profile(self, query, username):
+        return feeds.profile(username, self.server.base_url)
+
+    def playlist(self, query, playlist_id):
+        start, indexes = self.page(query)
+        data = feeds.feed([feeds.playlist_entry(playlist_id, i, self.server.base_url) for i in indexes],
+                          self.server.total, start, base_url=self.server.base_url)
+        data[u'feed'].update({
+            u'yt$playlistId': {u'$t': playlist_id},
+            u'author': [{u'name': {u'$t': u'channel0'}}],
+            u'media$group': {u'media$title': {u'$t': u'Synthetic playlist'},
+                             u'media$description': {u'$t': u'A synthetic playlist'}},
+        })
+        return data
+
+
+class GDataServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """ Serves synthetic GData v2 feeds (alt=json, and alt=jsonc for video
+        feeds) on localhost.
+
+        Every feed has `total` entries and is served `page_size` entries at a
+        time at most; each request is answered after `latency` seconds.
+        Responses are rendered once and then replayed, so the server spends
+        as little time as possible on each request.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port=0, latency=0, page_size=50, total=1000):
+        BaseHTTPServer.HTTPServer.__init__(self, ('127.0.0.1', port), Handler)
+        self.latency = latency
+        self.page_size = page_size
+        self.total = total
+        self.base_url = u'http://127.0.0.1:%d' % self.server_address[1]
+        self.rendered = {}
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def start(self):
+        """ Serves requests on a background thread """
+        self._thread = threading.Thread(target=self.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def client(self, cls=Client, *args, **kwargs):
+        """ Returns a client of class `cls` that talks to this server """
+        return client_class(self.base_url, cls)('pytube-benchmarks', *args, **kwargs)
+
+
+def client_class(base_url, cls=Client):
+    """ Returns a subclass of `cls` with its API URLs pointed at base_url """
+    overrides = {}
+    for name in dir(cls):
+        value = getattr(cls, name)
+        if name.endswith('_URL') and isinstance(value, basestring):
+            overrides[name] = re.sub(r'^https?://gdata\.youtube\.com', base_url, value)
+    return type('Benchmark' + cls.__name__, (cls,), overrides)
+
+
+if __name__ == '__main__':
+    server = GDataServer(*[int(arg) for arg in sys.argv[1:2]])
+    print 'Serving synthetic GData feeds on', server.base_url
+    server.serve_forever()
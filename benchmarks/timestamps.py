@@ -0,0 +1,50 @@
+""" Compares pytube's timestamp decoder against the strptime based one it
+    replaced.
+
+    Run from the repository root:  python -m benchmarks.timestamps [count]
+"""
+import datetime
+import sys
+import timeit
+
+from pytube import utils
+from benchmarks import feeds
+
+
+def strptime_yt_ts_to_datetime(yt_ts):
+    """ The decoder pytube used to use; note that it treats the first two
+        digits of the fraction as microseconds.
+    """
+    dt = datetime.datetime.strptime(yt_ts[:19], '%Y-%m-%dT%H:%M:%S')
+    dt = dt.replace(microsecond=int(yt_ts[20:22]))
+    return dt
+
+
+def fresh_decode(timestamps):
+    """ Decodes every timestamp without the benefit of the memo """
+    utils._ts_cache.clear()
+    return [utils.yt_ts_to_datetime(ts) for ts in timestamps]
+
+
+def main(count=10000):
+    unique = [feeds.timestamp(i) for i in xrange(count)]
+    # feeds repeat timestamps a lot: updated == published, feed-wide values...
+    repeated = [feeds.timestamp(i % (count / 10)) for i in xrange(count)]
+
+    cases = [
+        ('strptime, unique', lambda: [strptime_yt_ts_to_datetime(ts) for ts in unique]),
+        ('fixed layout, unique', lambda: fresh_decode(unique)),
+        ('strptime, repeated', lambda: [strptime_yt_ts_to_datetime(ts) for ts in repeated]),
+        ('fixed layout, repeated', lambda: fresh_decode(repeated)),
+        ('batch, repeated', lambda: (utils._ts_cache.clear(), utils.yt_ts_to_datetimes(repeated))),
+    ]
+    results = {}
+    for name, func in cases:
+        seconds = min(timeit.repeat(func, number=1, repeat=5))
+        results[name] = seconds
+        print '%-24s %8.2f us/timestamp' % (name, seconds * 1e6 / count)
+    return results
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -1,3 +1,4 @@
 from pytube.exceptions import *
 from pytube.client import Client
+from pytube.asynchronous import AsyncClient
 from pytube.utils import video_id_from_youtube_url
@@ -0,0 +1,155 @@
+import threading
+from multiprocessing.pool import ThreadPool
+
+from pytube.client import Client
+
+
+class AsyncStream(object):
+    """ Wraps a Stream so its pages can be fetched without blocking the
+        caller.
+
+        Attribute access falls through to the wrapped stream, so an
+        AsyncStream can be used anywhere a Stream is expected; the blocking
+        index/slice/len operations still work, and are serialized so the
+        stream's result cache is never filled from two threads at once.
+    """
+
+    _own_attributes = ('_stream', '_pool', '_lock')
+
+    def __init__(self, stream, pool):
+        object.__setattr__(self, '_stream', stream)
+        object.__setattr__(self, '_pool', pool)
+        object.__setattr__(self, '_lock', threading.RLock())
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+    def __setattr__(self, name, value):
+        if name in self._own_attributes:
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._stream, name, value)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._stream)
+
+    def __getitem__(self, key):
+        with self._lock:
+            return self._stream[key]
+
+    def __iter__(self):
+        """ Iterates the stream like a regular Stream, but always requests
+            the next page in the background while the current one is being
+            consumed.
+        """
+        size = self._stream.MAX_PAGE_SIZE
+        start = 0
+        pending = self.get(slice(start, start + size))
+        while pending is not None:
+            page = pending.get()
+            start += size
+            pending = None
+            if self._has_more(page, start):
+                pending = self.get(slice(start, start + size))
+            for item in page:
+                yield item
+
+    def __repr__(self):
+        return repr(self._stream)
+
+    def get(self, key, callback=None):
+        """ Fetches stream[key] on the worker pool and returns an AsyncResult.
+
+            `callback`, if given, is called with the index or slice result as
+            soon as it is available.
+        """
+        return self._pool.apply_async(self.__getitem__, (key,), callback=callback)
+
+    def get_count(self, callback=None):
+        """ Fetches the stream's count on the worker pool """
+        return self._pool.apply_async(len, (self,), callback=callback)
+
+    def each(self, callback):
+        """ Walks the whole stream on the worker pool, calling `callback` with
+            every item in order. Returns an AsyncResult that resolves to the
+            number of items visited once the stream is exhausted.
+        """
+        def walk():
+            size = self._stream.MAX_PAGE_SIZE
+            start = count = 0
+            while 1:
+                page = self[start:start + size]
+                for item in page:
+                    callback(item)
+                count += len(page)
+                start += size
+                if not self._has_more(page, start):
+                    return count
+        return self._pool.apply_async(walk)
+
+    def _has_more(self, page, start):
+        stream = self._stream
+        if len(page) < stream.MAX_PAGE_SIZE or start >= stream.MAX_RESULTS:
+            return False
+        return stream._count is None or start < stream._count
+
+
+class AsyncClient(Client):
+    """ A Client that runs its network calls on a pool of worker threads.
+
+        Lookups (video, videos, user_profile, playlist) return an AsyncResult
+        right away instead of blocking; call .get() on it to wait for the
+        result, or pass a `callback` to be notified when it is ready. Errors
+        are raised from .get(), exactly as the blocking Client would raise
+        them.
+
+        Streams returned by an AsyncClient are AsyncStreams, which can fetch
+        pages in the background. Models returned by an AsyncClient are the
+        same Video, Profile, Comment and Playlist classes the Client uses.
+    """
+
+    def __init__(self, app_name, dev_key=None, workers=10, **kwargs):
+        Client.__init__(self, app_name, dev_key, **kwargs)
+        self.workers = ThreadPool(workers)
+
+    def _async(self, func, args, callback=None):
+        return self.workers.apply_async(func, (self,) + args, callback=callback)
+
+    def close(self):
+        """ Waits for outstanding calls and shuts down the worker pool """
+        self.workers.close()
+        self.workers.join()
+
+    def user_profile(self, username='default', callback=None):
+        return self._async(Client.user_profile, (username,), callback)
+
+    def video(self, video_id, fields=None, callback=None):
+        return self._async(Client.video, (video_id, fields), callback)
+
+    def videos(self, video_ids, concurrency=10, callback=None):
+        return self._async(Client.videos, (video_ids, concurrency), callback)
+
+    def playlist(self, playlist_id, callback=None):
+        return self._async(Client.playlist, (playlist_id,), callback)
+
+    def user_videos(self, username='default', fields=None, format='json'):
+        return AsyncStream(Client.user_videos(self, username, fields, format), self.workers)
+
+    def user_subscriptions(self, username='default'):
+        return AsyncStream(Client.user_subscriptions(self, username), self.workers)
+
+    def video_search(self, q=None, fields=None, format='json', **query):
+        return AsyncStream(Client.video_search(self, q, fields, format, **query), self.workers)
+
+    def video_comments(self, video_id):
+        return AsyncStream(Client.video_comments(self, video_id), self.workers)
+
+    def video_responses(self, video_id, format='json'):
+        return AsyncStream(Client.video_responses(self, video_id, format), self.workers)
+
+    def related_videos(self, video_id, format='json'):
+        return AsyncStream(Client.related_videos(self, video_id, format), self.workers)
+
+    def _link_stream(self, uri):
+        return AsyncStream(Client._link_stream(self, uri), self.workers)
@@ -0,0 +1,109 @@
+import threading
+import time
+from collections import OrderedDict
+
+from pytube.utils import Slotted
+
+
+class CacheEntry(Slotted):
+    __slots__ = ('value', 'etag', 'size', 'expires')
+
+    def __init__(self, value, etag, size, expires):
+        self.value = value
+        self.etag = etag
+        self.size = size
+        self.expires = expires
+
+
+class ResponseCache(object):
+    """ An in-memory LRU cache of decoded API responses.
+
+        The cache is bounded by `max_bytes`, measured as the size of the raw
+        response bodies; the least recently used responses are evicted first.
+        Responses are fresh for `ttl` seconds, or for the number of seconds
+        given in `ttls` for their resource (one of the names returned by
+        Client._endpoint, eg. 'video' or 'search'). Once a response is stale
+        the client revalidates it with If-None-Match, and reuses the cached
+        body if youtube answers 304 Not Modified.
+
+        Cached responses are shared between callers, so they must not be
+        modified.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, ttl=60, ttls=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.ttls = ttls or {}
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, key):
+        """ Returns a (entry, fresh) tuple for key; entry is None when there
+            is nothing cached. Fresh lookups are counted as hits.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None, False
+            self._entries[key] = entry
+            fresh = entry.expires > time.time()
+            if fresh:
+                self.hits += 1
+            return entry, fresh
+
+    def store(self, key, value, etag, size, resource=None):
+        """ Caches a freshly downloaded response, counted as a miss """
+        entry = CacheEntry(value, etag, size, time.time() + self._ttl(resource))
+        with self._lock:
+            self.misses += 1
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= old.size
+            if size > self.max_bytes:
+                return
+            self._entries[key] = entry
+            self.size += size
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= evicted.size
+
+    def revalidate(self, key, resource=None):
+        """ Marks a cached response as fresh again after a 304 """
+        with self._lock:
+            self.revalidations += 1
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.expires = time.time() + self._ttl(resource)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidations': self.revalidations,
+            'entries': len(self._entries),
+            'bytes': self.size,
+        }
+
+    def _ttl(self, resource):
+        return self.ttls.get(resource, self.ttl)
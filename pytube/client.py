@@ -1,19 +1,34 @@
 try: import simplejson as json
 except ImportError: import json
+try: import numpy
+except ImportError: numpy = None
+import array
+import calendar
+import collections
+import itertools
 import re
 import operator
+import sys
+import threading
+import time
 import urllib, urllib2
 import datetime
 import warnings
 import logging
-import httplib
-import contextlib
 import urlparse
+import StringIO
+import Queue
 import xml.sax.saxutils as saxutils
+from multiprocessing.pool import ThreadPool
 
 
+from pytube.jsonstream import FeedParser
+from pytube.metrics import MeteredResponse
+from pytube.mutations import Mutation, MutationQueue
+from pytube import mutations
+from pytube.pool import BufferedResponse, ConnectionPool, DecompressingResponse
 from pytube.stream import Stream, YtData
-from pytube.utils import yt_ts_to_datetime
+from pytube.utils import yt_ts_to_datetime, yt_ts_to_datetimes, intern_string, Slotted
 import pytube.exceptions
 
 
@@ -23,10 +38,42 @@ class Category(str):
     """
     SCHEME = u'http://gdata.youtube.com/schemas/2007/categories.cat'
 
+    _instances = {}
+
+    @classmethod
+    def get(cls, term, label):
+        """ Returns a Category shared by every video in that category """
+        key = (term, label)
+        category = cls._instances.get(key)
+        if category is None:
+            category = cls._instances.setdefault(key, cls(term))
+            category.label = label
+        return category
+
+
+class Serializable(object):
+    """ Gives models a compact binary form; see pytube.serialize """
+    __slots__ = ()
+
+    def to_bytes(self):
+        from pytube import serialize
+        return serialize.dumps(self)
+
+    @classmethod
+    def from_bytes(cls, data, client=None):
+        """ Loads an object serialized with to_bytes, bound to `client` """
+        from pytube import serialize
+        obj = serialize.loads(data, client)
+        if not isinstance(obj, cls):
+            raise ValueError("Not a %s record" % cls.__name__)
+        return obj
+
 
 class LinksMixin(object):
     """ Provides parsing of strangely formatted youtube api links objects
     """
+    __slots__ = ()
+
     def _parse_links(self, links):
         self._links = {}
         for link in links:
@@ -39,16 +86,16 @@ class LinksMixin(object):
 
         # check to see if we can set up some useful references
         if 'video.related' in self._links:
-            self.related_videos = VideoStream(self.client, self._links['video.related'][u'href'])
+            self.related_videos = self.client._link_stream(self._links['video.related'][u'href'])
         if 'video.responses' in self._links:
-            self.video_responses = VideoStream(self.client, self._links['video.responses'][u'href'])
+            self.video_responses = self.client._link_stream(self._links['video.responses'][u'href'])
         if 'insight.views' in self._links:
             self.insight_url = self._links['insight.views']['href']
         if 'edit' in self._links:
             self.edit_url = self._links['edit'][u'href']
 
 
-class Profile(YtData, LinksMixin):
+class Profile(YtData, LinksMixin, Serializable):
     """ Collects data about a YouTube user/channel. """
 
     def __init__(self, client, data):
@@ -93,11 +140,28 @@ class Profile(YtData, LinksMixin):
         return u"<YouTube Profile: %s>" % (str(self.id),)
 
 
-class Video(YtData, LinksMixin):
-    """ Collects data about a YouTube Video. """
+class Video(Slotted, YtData, LinksMixin, Serializable):
+    """ Collects data about a YouTube Video.
+
+        Videos keep their attributes in slots rather than a __dict__, since
+        applications often hold very many of them at once.
+    """
+
+    __slots__ = (
+        'client', 'id', 'api_id', 'title', 'author', 'category', 'keywords',
+        'description', 'updated', 'published', 'uploaded', 'duration',
+        'aspect_ratio', 'private', 'access_control', 'like_count',
+        'dislike_count', 'favorite_count', 'view_count', 'comment_count',
+        'comments', 'related_videos', 'video_responses', 'insight_url',
+        'edit_url', '_links', '_data', '_pending',
+    )
 
     EDIT_URL = "http://gdata.youtube.com/feeds/api/users/%(user_id)s/uploads/%(video_id)s"
 
+    # guards the lazy decoding in __getattr__; shared by every video, as
+    # slotted videos have no room for a lock of their own
+    _decode_lock = threading.RLock()
+
     def _parse_categories(self, data):
         """ Given category data from the youtube API, parse it into the
             category and keyword attributes on self.
@@ -105,91 +169,242 @@ class Video(YtData, LinksMixin):
         # parse the category
         categories = [c for c in data if c['scheme'] == Category.SCHEME]
         assert len(categories) == 1
-        self.category = Category(categories[0]['term'])
-        self.category.label = categories[0]['label']
+        self.category = Category.get(categories[0]['term'], categories[0]['label'])
 
         # parse keywords
         keyword_scheme = u'http://gdata.youtube.com/schemas/2007/keywords.cat'
         keywords = [kw for kw in data if kw['scheme'] == keyword_scheme]
-        self.keywords = [kw['term'] for kw in keywords]
+        self.keywords = [intern_string(kw['term']) for kw in keywords]
         return
 
     def _init_jsonc(self, data):
-        # missing insight_url and private fields when compared to json resposne
+        # missing insight_url and private fields when compared to json resposne.
+        # Restricted videos and partial responses leave out any of the rest
+        # but the id.
         self.id = data['id']
-        self.title = data['title']
-        self.author = data['uploader']
-        self.category = data['category']
-        self.description = data['description']
-        self.comment_count = int(data['commentCount'])
-        self.comments = self.client.video_comments(self.id)
-        self.duration = int(data['duration'])
-        self.favorite_count = int(data['favoriteCount'])
-        self.like_count = int(data['likeCount'])
-        self.updated = yt_ts_to_datetime(data['updated'])
-        self.uploaded = yt_ts_to_datetime(data['uploaded'])
-        self.published = self.uploaded
-        self.view_count = int(data['viewCount'])
-        self.aspect_ratio = data['aspectRatio']
-        self.keywords = data['tags']
-        self.dislike_count = int(data['ratingCount']) - self.like_count
+        if 'title' in data:
+            self.title = data['title']
+        if 'uploader' in data:
+            self.author = intern_string(data['uploader'])
+        if 'category' in data:
+            self.category = intern_string(data['category'])
+        if 'description' in data:
+            self.description = data['description']
+        if 'commentCount' in data:
+            self.comment_count = int(data['commentCount'])
+        if 'duration' in data:
+            self.duration = int(data['duration'])
+        if 'favoriteCount' in data:
+            self.favorite_count = int(data['favoriteCount'])
+        if 'likeCount' in data:
+            self.like_count = int(data['likeCount'])
+            if 'ratingCount' in data:
+                self.dislike_count = int(data['ratingCount']) - self.like_count
+        if 'updated' in data:
+            self.updated = yt_ts_to_datetime(data['updated'])
+        if 'uploaded' in data:
+            self.uploaded = yt_ts_to_datetime(data['uploaded'])
+            self.published = self.uploaded
+        if 'viewCount' in data:
+            self.view_count = int(data['viewCount'])
+        if 'aspectRatio' in data:
+            self.aspect_ratio = intern_string(data['aspectRatio'])
+        if 'tags' in data:
+            self.keywords = [intern_string(tag) for tag in data['tags']]
+        if 'accessControl' in data:
+            self.access_control = dict((intern_string(action), intern_string(permission))
+                                       for action, permission in data['accessControl'].iteritems())
         self.private = False # Not returned by jsonc for now
-
-    def _init_json(self, data):
-        self._parse_links(data[u'link'])
-        self._parse_categories(data[u'category'])
-        self.title = data[u'title'][u'$t']
-        self.author = data[u'author'][0][u'name'][u'$t']
+        # the child streams only need the id; they're built the first time
+        # they're read, so there's no raw entry to keep around
+        self._data = None
+        self._pending = set(decoder for decoder, attributes in self.JSONC_DECODERS)
+
+    @staticmethod
+    def selector(fields):
+        """ Returns the GData partial response selector `fields`, with the
+            entry id added if it doesn't already select it; every video
+            needs its id.
+        """
+        depth, names, name = 0, [], ''
+        for char in fields:
+            if char in '([':
+                depth += 1
+            elif char in ')]':
+                depth -= 1
+            elif char == ',' and not depth:
+                names.append(name.strip())
+                name = ''
+                continue
+            if not depth and char not in ')]':
+                name += char
+        names.append(name.strip())
+        if 'id' in names:
+            return fields
+        return 'id,' + fields
+
+    @staticmethod
+    def _id_from_api_id(api_id):
+        # v2 entries are identified by a tag:youtube.com,2008:video:<id> uri,
+        # v1 entries by their feed url
+        if api_id.startswith('tag:youtube.com,2008:video:'):
+            return api_id[len('tag:youtube.com,2008:video:'):].split(':')[0]
+        assert api_id.startswith('http://gdata.youtube.com/feeds/api/videos/')
+        assert len(api_id) == 53
+        return api_id[-11:]
+
+    def _init_json(self, data, lazy=False):
+        # entries fetched with a partial response selector may be missing
+        # anything but their id
+        if u'title' in data:
+            self.title = data[u'title'][u'$t']
+        if u'author' in data:
+            self.author = intern_string(data[u'author'][0][u'name'][u'$t'])
         self.api_id = data[u'id']['$t']
 
         try:
             self.id = data[u'media$group'][u'yt$videoid'][u'$t']
         except KeyError:
-            assert data[u'id'][u'$t'].startswith('http://gdata.youtube.com/feeds/api/videos/')
-            assert len(data[u'id'][u'$t']) == 53
-            self.id = data[u'id'][u'$t'][-11:]
-
-        self.updated = yt_ts_to_datetime(data[u'updated'][u'$t'])
+            self.id = self._id_from_api_id(data[u'id'][u'$t'])
+
+        if lazy:
+            # keep the raw entry around; __getattr__ decodes the rest of the
+            # attributes as they are asked for.
+            self._data = data
+            self._pending = set(decoder for decoder, attributes in self.DECODERS)
+            return
+        for decoder, attributes in self.DECODERS:
+            getattr(self, decoder)(data)
+
+    # The attributes set by each of the decoders below. Lazily loaded videos
+    # only run a decoder the first time one of its attributes is read.
+    DECODERS = (
+        ('_decode_links', ('_links', 'related_videos', 'video_responses', 'insight_url', 'edit_url')),
+        ('_decode_categories', ('category', 'keywords')),
+        ('_decode_dates', ('updated', 'published', 'uploaded')),
+        ('_decode_statistics', ('like_count', 'dislike_count', 'favorite_count', 'view_count', 'comment_count')),
+        ('_decode_access_control', ('access_control',)),
+        ('_decode_comments', ('comments',)),
+        ('_decode_media', ('description', 'duration', 'aspect_ratio', 'private')),
+    )
+    # JSON-C videos decode everything up front but their child streams
+    JSONC_DECODERS = (
+        ('_decode_jsonc_feeds', ('related_videos', 'video_responses')),
+        ('_decode_jsonc_comments', ('comments',)),
+    )
+    # the decoders that may set each attribute, depending on the format
+    LAZY_ATTRIBUTES = {}
+    for decoder, attributes in DECODERS + JSONC_DECODERS:
+        for attribute in attributes:
+            LAZY_ATTRIBUTES[attribute] = LAZY_ATTRIBUTES.get(attribute, ()) + (decoder,)
+    del decoder, attributes, attribute
+
+    def _decode_links(self, data):
+        if u'link' in data:
+            self._parse_links(data[u'link'])
+
+    def _decode_categories(self, data):
+        if u'category' in data:
+            self._parse_categories(data[u'category'])
+
+    def _decode_dates(self, data):
+        if u'updated' in data:
+            self.updated = yt_ts_to_datetime(data[u'updated'][u'$t'])
         if u'published' in data: # Not given to us by playlists
             self.published = yt_ts_to_datetime(data[u'published'][u'$t'])
-        else:
+        elif u'updated' in data:
             self.published = self.updated # just default to updated date for now
+        # Doesn't exist for certain restricted videos
+        if u'yt$uploaded' in data.get(u'media$group', ()):
+            self.uploaded = yt_ts_to_datetime(data[u'media$group'][u'yt$uploaded'][u'$t'])
 
+    def _decode_statistics(self, data):
+        # All of these don't exist for certain restricted videos
         if u'yt$rating' in data:
             self.like_count = int(data[u'yt$rating'][u'numLikes'])
             self.dislike_count = int(data[u'yt$rating'][u'numDislikes'])
+        if u'yt$statistics' in data:
+            self.favorite_count = int(data[u'yt$statistics'][u'favoriteCount'])
+            self.view_count = int(data[u'yt$statistics'][u'viewCount'])
+        if u'gd$comments' in data:
+            self.comment_count = int(data[u'gd$comments'][u'gd$feedLink'][u'countHint'])
+
+    def _decode_access_control(self, data):
+        if u'yt$accessControl' not in data:
+            return
+        self.access_control = dict((intern_string(d[u'action']), intern_string(d[u'permission']))
+                                   for d in data[u'yt$accessControl'])
+
+    def _decode_comments(self, data):
+        self.comments = self.client.video_comments(self.id)
+        if u'gd$comments' in data:
+            self.comments._count = int(data[u'gd$comments'][u'gd$feedLink'][u'countHint'])
 
-        self.access_control = dict((d[u'action'], d[u'permission']) for d in data[u'yt$accessControl'])
+    def _decode_jsonc_feeds(self, data):
+        # jsonc entries carry no links, but these feeds only need the id
+        self.related_videos = self.client.related_videos(self.id, format='jsonc')
+        self.video_responses = self.client.video_responses(self.id, format='jsonc')
+
+    def _decode_jsonc_comments(self, data):
         self.comments = self.client.video_comments(self.id)
+        comment_count = getattr(self, 'comment_count', None)
+        if comment_count is not None:
+            self.comments._count = comment_count
 
+    def _decode_media(self, data):
+        if u'media$group' not in data:
+            return
         # All the following attributes don't exist for certain restricted videos
         if u'media$description' in data[u'media$group']:
             self.description = data[u'media$group'][u'media$description'][u'$t']
-        if u'yt$uploaded' in data[u'media$group']:
-            self.uploaded = yt_ts_to_datetime(data[u'media$group'][u'yt$uploaded'][u'$t'])
         if u'yt$duration' in data[u'media$group']:
             self.duration = int(data[u'media$group'][u'yt$duration'][u'seconds'])
         if u'yt$aspectRatio' in data[u'media$group']:
-            self.aspect_ratio = data[u'media$group'][u'yt$aspectRatio'][u'$t']
-        if u'yt$statistics' in data:
-            self.favorite_count = int(data[u'yt$statistics'][u'favoriteCount'])
-            self.view_count = int(data[u'yt$statistics'][u'viewCount'])
-        if u'gd$comments' in data:
-            self.comment_count = int(data[u'gd$comments'][u'gd$feedLink'][u'countHint'])
-            self.comments._count = self.comment_count
+            self.aspect_ratio = intern_string(data[u'media$group'][u'yt$aspectRatio'][u'$t'])
 
         if u'yt$private' in data[u'media$group']:
             self.private = True
         else:
             self.private = False
 
-    def __init__(self, client, data, data_format='json'):
+    def __getattr__(self, name):
+        # only called for attributes that haven't been set yet; see if a
+        # lazily loaded video still has to decode it.
+        decoders = self.LAZY_ATTRIBUTES.get(name)
+        if decoders is None:
+            raise AttributeError(name)
+        # another thread may be decoding the same video; once we hold the
+        # lock its decoder has either run or is still pending.
+        with self._decode_lock:
+            try:
+                pending = self._pending
+            except AttributeError:
+                pending = ()
+            for decoder in decoders:
+                if decoder in pending:
+                    pending.remove(decoder)
+                    getattr(self, decoder)(self._data)
+                    if not pending:
+                        del self._data
+                        del self._pending
+                    break
+        return object.__getattribute__(self, name)
+
+    def __init__(self, client, data, data_format='json', lazy=None):
+        """ Builds a video from an API entry.
+
+            When `lazy` is true, most attributes are only decoded from the
+            entry the first time they are read. It defaults to the client's
+            `lazy_videos` setting.
+        """
         self.client = client
 
         if data_format == 'jsonc':
             self._init_jsonc(data)
         else:
-            self._init_json(data)
+            if lazy is None:
+                lazy = getattr(client, 'lazy_videos', False)
+            self._init_json(data, lazy)
 
     def __repr__(self):
         return "<YouTube Video: %s>" % (str(self.id),)
@@ -203,42 +418,19 @@ class Video(YtData, LinksMixin):
     def update(self, timeout=None):
         """ Updates this video's metadata on youtube
         """
-        timeout = timeout or self.client.default_timeout
-        xml_template = """<?xml version="1.0"?>
-<entry xmlns="http://www.w3.org/2005/Atom"
-  xmlns:media="http://search.yahoo.com/mrss/"
-  xmlns:yt="http://gdata.youtube.com/schemas/2007">
-  <media:group>
-    <media:title type="plain">{title}</media:title>
-    <media:description type="plain">{description}</media:description>
-    <media:category scheme="http://gdata.youtube.com/schemas/2007/categories.cat">{category}</media:category>
-    <media:keywords>{keywords}</media:keywords>
-    {private}
-  </media:group>
-{accessControl}
-</entry>
-        """
-
-        def format_acl_row(a,p):
-            template = """  <yt:accessControl action="{a}" permission="{p}"/>"""
-            return template.format(a=a,p=p)
-
-        def format_acl():
-            return '\n'.join(
-                format_acl_row(k,v) for k,v in self.access_control.items()
-            )
+        self._update_mutation().perform(self.client, timeout)
 
+    def _update_mutation(self):
         params = {
             'title': saxutils.escape(self.title).encode('utf-8'),
             'description': saxutils.escape(self.description).encode('utf-8'),
-            'category': self.category,
+            'category': saxutils.escape(self.category).encode('utf-8'),
             'keywords': ','.join(saxutils.escape(k).encode('utf-8') for k in self.keywords),
-            'accessControl': format_acl(),
+            'accessControl': '\n'.join(mutations.ACCESS_CONTROL % (a.encode('utf-8'), p.encode('utf-8'))
+                                       for a, p in self.access_control.items()),
             'private': """<yt:private/>""" if self.private else ''
         }
 
-        request_body = xml_template.format(**params)
-
         # get the url
         edit_url = getattr(self, 'edit_url', None)
         if not edit_url:
@@ -246,44 +438,162 @@ class Video(YtData, LinksMixin):
                 'user_id': self.author,
                 'video_id': self.id,
             }
-        url = urlparse.urlparse(edit_url)
-
-        headers = self.client._default_headers()
-        headers['GData-Version'] = 2
-        headers['Content-Type'] = 'application/atom+xml'
-
-        # urllib2 doesn't support the PUT method.
-        # time to use httplib instead.
-        with contextlib.closing(
-            httplib.HTTPConnection(url.netloc, timeout=timeout)
-            ) as connection:
-            connection.request("PUT", url.path, request_body, headers)
-            response = connection.getresponse()
-            response_body = response.read()
-        if response.status != 200:
-            data = {
-                'url': edit_url,
-                'request_body': request_body,
-                'headers': headers,
-                'response': response,
-                'response_body': response_body
-            }
-            msg = 'Response Status: %s\n%s' % (response.status, response_body)
-            e = pytube.exceptions.VideoUpdateException(msg, data)
-            raise e
-        return
+
+        # urllib2 doesn't support the PUT method, so this goes straight
+        # through the client's connection pool.
+        return Mutation("PUT", edit_url, mutations.VIDEO_UPDATE % params, (200,),
+                        mutations.video_update_error)
+
+
+class Column(object):
+    """ Collects the values of one field of a VideoStream into an array.
+
+        With numpy installed the result is a numpy masked array, with missing
+        values masked out; otherwise it is an array.array of doubles, with
+        missing values set to NaN.
+    """
+
+    def __init__(self, size, dtype):
+        self.dtype = dtype
+        if numpy is not None:
+            self.values = numpy.zeros(size, dtype=dtype)
+            self.mask = numpy.zeros(size, dtype=bool)
+        else:
+            self.values = array.array('d')
+
+    def put(self, index, values):
+        """ Stores a page of values, starting at index; None marks a missing
+            value.
+        """
+        if numpy is None:
+            nan = float('nan')
+            self.values.extend(nan if v is None else v for v in values)
+            return
+        end = index + len(values)
+        if end > len(self.values):
+            # the stream grew while we were reading it
+            self.values = numpy.resize(self.values, end)
+            self.mask = numpy.resize(self.mask, end)
+        self.values[index:end] = [0 if v is None else v for v in values]
+        self.mask[index:end] = [v is None for v in values]
+
+    def finish(self, size):
+        if numpy is None:
+            return self.values
+        return numpy.ma.MaskedArray(self.values[:size], mask=self.mask[:size])
+
 
 class VideoStream(Stream, LinksMixin):
     """ Stream for parsing YouTube Video results """
 
-    def _handle_data(self, data):
+    # how to find each of the numeric fields supported by to_columns in a
+    # raw feed entry; published is handled separately.
+    COLUMNS = {
+        'view_count': lambda e: e[u'yt$statistics'][u'viewCount'],
+        'favorite_count': lambda e: e[u'yt$statistics'][u'favoriteCount'],
+        'like_count': lambda e: e[u'yt$rating'][u'numLikes'],
+        'dislike_count': lambda e: e[u'yt$rating'][u'numDislikes'],
+        'comment_count': lambda e: e[u'gd$comments'][u'gd$feedLink'][u'countHint'],
+        'duration': lambda e: e[u'media$group'][u'yt$duration'][u'seconds'],
+    }
+    # the same, for jsonc feeds; dislike_count is handled separately.
+    JSONC_COLUMNS = {
+        'view_count': lambda e: e[u'viewCount'],
+        'favorite_count': lambda e: e[u'favoriteCount'],
+        'like_count': lambda e: e[u'likeCount'],
+        'comment_count': lambda e: e[u'commentCount'],
+        'duration': lambda e: e[u'duration'],
+    }
+    COLUMN_FIELDS = tuple(sorted(COLUMNS)) + ('published',)
+
+    def to_columns(self, fields=None, limit=None):
+        """ Reads numeric fields of every video in the stream into arrays,
+            without building Video objects.
+
+            Returns a dict mapping each of `fields` (by default all of
+            view_count, like_count, dislike_count, favorite_count,
+            comment_count, duration and published) to an array holding that
+            field for every video, in stream order. published is given in
+            seconds since the epoch. See Column for how values that
+            restricted videos leave out are represented.
+
+            At most `limit` (and never more than MAX_RESULTS) videos are read.
+        """
+        fields = tuple(fields or self.COLUMN_FIELDS)
+        for field in fields:
+            if field not in self.COLUMN_FIELDS:
+                raise ValueError("Unknown column: %s" % field)
+        limit = min(limit or self.MAX_RESULTS, self.MAX_RESULTS)
+
+        columns = None
+        index = 0
+        while index < limit:
+            size = min(limit - index, self.MAX_PAGE_SIZE)
+            data = self._fetch_page((index + 1, size))
+            self._handle_feed(data)
+            entries = self._entries(data)
+            if columns is None:
+                # now that we know how long the stream is, size the arrays
+                total = min(limit, self._count)
+                columns = dict(
+                    (field, Column(total, 'float64' if field == 'published' else 'int64'))
+                    for field in fields)
+            for field in fields:
+                columns[field].put(index, self._column_values(field, entries))
+            index += len(entries)
+            if len(entries) < size:
+                break
+        return dict((field, column.finish(index)) for field, column in columns.iteritems())
+
+    def _column_values(self, field, entries):
+        if field == 'published':
+            if self.format == 'jsonc':
+                timestamps = [e[u'uploaded'] for e in entries]
+            else:
+                timestamps = [e[u'published'][u'$t'] if u'published' in e else e[u'updated'][u'$t']
+                              for e in entries]
+            return [calendar.timegm(dt.utctimetuple()) + dt.microsecond / 1e6
+                    for dt in yt_ts_to_datetimes(timestamps)]
+        if self.format == 'jsonc':
+            if field == 'dislike_count':
+                extract = lambda e: int(e[u'ratingCount']) - int(e[u'likeCount'])
+            else:
+                extract = self.JSONC_COLUMNS[field]
+        else:
+            extract = self.COLUMNS[field]
+        values = []
+        for entry in entries:
+            try:
+                values.append(int(extract(entry)))
+            except KeyError:
+                values.append(None)
+        return values
+
+    def _handle_feed(self, data):
+        if self.format == 'jsonc':
+            return self._handle_jsonc_feed(data)
         assert data[u'version'] == u'1.0', "Youtube API version mismatch"
-        self._count = int(data[u'feed'][u'openSearch$totalResults'][u'$t'])
-        self.title = data[u'feed'][u'title'][u'$t']
-        self.updated = yt_ts_to_datetime(data[u'feed'][u'updated'][u'$t'])
-        self._parse_links(data[u'feed'][u'link'])
-        videos = data['feed'].get('entry', ())
-        return [Video(self.client, x) for x in videos]
+        feed = data[u'feed']
+        self._count = int(feed[u'openSearch$totalResults'][u'$t'])
+        # left out of partial responses
+        if u'title' in feed:
+            self.title = feed[u'title'][u'$t']
+        if u'updated' in feed:
+            self.updated = yt_ts_to_datetime(feed[u'updated'][u'$t'])
+        if u'link' in feed:
+            self._parse_links(feed[u'link'])
+
+    def _handle_jsonc_feed(self, data):
+        feed = data[u'data']
+        self._count = int(feed[u'totalItems'])
+        if u'updated' in feed:
+            self.updated = yt_ts_to_datetime(feed[u'updated'])
+
+    def _handle_entry(self, entry):
+        return Video(self.client, entry, self.format)
+
+    def _feed_fields(self, fields):
+        return Stream._feed_fields(self, Video.selector(fields))
 
     def __repr__(self):
         return "<YouTube VideoStream: %s>" % (self.uri,)
@@ -295,11 +605,12 @@ class VideoStream(Stream, LinksMixin):
 class SubscriptionStream(Stream):
     """ Stream for parsing YouTube Subscription results """
 
-    def _handle_data(self, data):
+    def _handle_feed(self, data):
         assert data[u'version'] == u'1.0', "Youtube API version mismatch"
         self._count = int(data[u'feed'][u'openSearch$totalResults'][u'$t'])
-        subscriptions = data['feed'].get('entry', ())
-        return [subscription['yt$username']['$t'] for subscription in subscriptions]
+
+    def _handle_entry(self, entry):
+        return entry['yt$username']['$t']
 
     def __repr__(self):
         return "<YouTube Subscriptions: %s>" % (self.uri,)
@@ -308,13 +619,15 @@ class SubscriptionStream(Stream):
         return u"<YouTube VideoStream: %s>" % (self.uri,)
 
 
-class Comment(object):
+class Comment(Slotted, Serializable):
     """ Transforms YouTube API response into a usable comment object with
         native datatypes.
     """
+    __slots__ = ('id', 'author', 'title', 'content', 'published', 'updated')
+
     def __init__(self, data):
         self.id = data[u'id'][u'$t']
-        self.author = data[u'author'][0][u'name'][u'$t']
+        self.author = intern_string(data[u'author'][0][u'name'][u'$t'])
         self.title = data[u'title'][u'$t']
         self.content = data[u'content'][u'$t']
         self.published = yt_ts_to_datetime(data[u'published'][u'$t'])
@@ -323,30 +636,55 @@ class Comment(object):
 
 class CommentStream(Stream, LinksMixin):
     """ Stream for parsing YouTube Comment results """
-    def _handle_data(self, data):
+    def _handle_feed(self, data):
         assert data[u'version'] == u'1.0', "Youtube API version mismatch"
         self._count = int(data[u'feed'][u'openSearch$totalResults'][u'$t'])
         self.title = data[u'feed'][u'title'][u'$t']
         self.updated = yt_ts_to_datetime(data[u'feed'][u'updated'][u'$t'])
         self._parse_links(data[u'feed'][u'link'])
-        return [Comment(d) for d in data['feed']['entry']]
 
+    def _handle_entry(self, entry):
+        return Comment(entry)
+
+
+class PlaylistEntry(Slotted, Serializable):
+    """ An entry of a playlist. Its video is only built from the entry data
+        the first time it is read.
+    """
+    __slots__ = ('id', 'api_id', 'position', 'playlist_id', 'video_id', '_video', '_client', '_data')
 
-class PlaylistEntry(object):
     def __init__(self, client, playlist_id, entry_data):
         self.id = entry_data[u'id'][u'$t'].split(':')[-1]
         self.api_id = entry_data[u'id'][u'$t']
         self.position = int(entry_data[u'yt$position'][u'$t'])
-        self.playlist_id = playlist_id
-
-        vid = Video(client, entry_data)
-        self.video = vid
+        self.playlist_id = intern_string(playlist_id)
+        self._client = client
+        self._data = entry_data
+        try:
+            self.video_id = entry_data[u'media$group'][u'yt$videoid'][u'$t']
+        except KeyError:
+            self.video_id = self.video.id
 
+    def _get_video(self):
+        try:
+            return self._video
+        except AttributeError:
+            pass
+        vid = Video(self._client, self._data)
         # replace api_id since it'll be the playlist entry api_id and not the video one
         vid.api_id = vid.api_id[:vid.api_id.find('playlist')] + 'video:' + vid.id
+        self.video = vid
+        return vid
+
+    def _set_video(self, video):
+        self._video = video
+        self.video_id = video.id
+        self._data = None
+
+    video = property(_get_video, _set_video)
 
     def __str__(self):
-        return '<PlaylistEntry %s: %s (%s)' % (self.position, self.id, self.video.id)
+        return '<PlaylistEntry %s: %s (%s)' % (self.position, self.id, self.video_id)
 
     def __repr__(self):
         return self.__str__()
@@ -355,88 +693,250 @@ class PlaylistEntry(object):
         return self.__str__()
 
 
+class PlaylistEntryStream(Stream):
+    """ Stream of the entries of a playlist, in position order """
+
+    # playlists may be paged through further than other feeds
+    MAX_RESULTS = 5000
+
+    def __init__(self, client, uri, playlist_id, **kwargs):
+        Stream.__init__(self, client, uri, **kwargs)
+        self.playlist_id = playlist_id
+
+    def __getitem__(self, key):
+        # entries used to be a list; keep counting from the end working
+        if isinstance(key, (int, long)) and key < 0:
+            key += self.count
+            if key < 0:
+                raise IndexError
+        elif isinstance(key, slice) and ((key.start or 0) < 0 or (key.stop or 0) < 0):
+            key = slice(self._from_end(key.start), self._from_end(key.stop), key.step)
+        return Stream.__getitem__(self, key)
+
+    def _from_end(self, bound):
+        if bound is None or bound >= 0:
+            return bound
+        return max(bound + self.count, 0)
+
+    def _handle_feed(self, data):
+        assert data[u'version'] == u'1.0', "Youtube API version mismatch"
+        self._count = int(data[u'feed'][u'openSearch$totalResults'][u'$t'])
+
+    def _handle_entry(self, entry):
+        return PlaylistEntry(self.client, self.playlist_id, entry)
+
+    def __repr__(self):
+        return "<YouTube PlaylistEntryStream: %s>" % (self.uri,)
+
+    def __unicode__(self):
+        return u"<YouTube PlaylistEntryStream: %s>" % (self.uri,)
+
+
 class Playlist(object):
+    """ A youtube playlist.
+
+        `entries` is a PlaylistEntryStream, fetched a page at a time as it
+        is read (prefetching the next page while iterating) and indexed by
+        position. Iterating it only keeps the page being read, so walking
+        even a 5000 entry playlist takes constant memory. Looking entries up
+        by video, and adding or removing them, reads the whole playlist once
+        and keeps every entry in memory, indexed by entry and video id, from
+        then on.
+    """
     ADD_VIDEO_URL = "http://gdata.youtube.com/feeds/api/playlists/%(playlist_id)s?v=2&alt=json"
     EDIT_VIDEO_URL = "http://gdata.youtube.com/feeds/api/playlists/%(playlist_id)s/%(playlist_entry_id)s"
 
     def __init__(self, client, data):
         assert data[u'version'] == u'1.0', "Youtube API version mismatch"
-        data = data['feed']
+        feed = data['feed']
 
         self.client = client
-        self.id = data[u'yt$playlistId'][u'$t']
-        self.author = data[u'author'][0][u'name'][u'$t']
-        self.title = data[u'media$group'][u'media$description'][u'$t']
-        self.description = data[u'media$group'][u'media$title'][u'$t']
-        self.updated = yt_ts_to_datetime(data[u'updated'][u'$t'])
+        self.id = feed[u'yt$playlistId'][u'$t']
+        self.author = feed[u'author'][0][u'name'][u'$t']
+        self.title = feed[u'media$group'][u'media$description'][u'$t']
+        self.description = feed[u'media$group'][u'media$title'][u'$t']
+        self.updated = yt_ts_to_datetime(feed[u'updated'][u'$t'])
 
         self._handle_videos(data)
 
     def _handle_videos(self, data):
         """
-        Loads each video into a PlaylistEntry and returns them listed in order
+        Sets up the stream of entries, starting with the first page, which
+        came with the playlist
+        """
+        self.entries = PlaylistEntryStream(
+            self.client, self.client.YOUTUBE_PLAYLIST_URL % {'playlist_id': self.id}, self.id,
+            window=1, prefetch=True)
+        self.entries._store_page(0, self.entries._build(data))
+        # every entry in position order, once the playlist has been indexed
+        self._ordered = None
+        self._entries_by_id = None
+        self._entries_by_video = None
+
+    def _index(self):
+        """ Reads the whole playlist, indexing it by entry id and video id """
+        if self._ordered is not None:
+            return
+        self._ordered = list(self.entries)
+        self._entries_by_id = {}
+        self._entries_by_video = {}
+        for entry in self._ordered:
+            self._add_to_index(entry)
+        # every entry is held from now on anyway, so serve the stream from
+        # them instead of fetching evicted pages again
+        self.entries.window = None
+        self.entries._reset(self._ordered)
+
+    def _add_to_index(self, entry):
+        self._entries_by_id[entry.id] = entry
+        self._entries_by_video.setdefault(entry.video_id, []).append(entry)
+
+    def _remove_from_index(self, entry):
+        del self._entries_by_id[entry.id]
+        entries = self._entries_by_video[entry.video_id]
+        entries.remove(entry)
+        if not entries:
+            del self._entries_by_video[entry.video_id]
+
+    def _reconcile(self):
+        """ Drops removed entries, renumbers the positions of the rest and
+            brings the entry stream up to date.
         """
-        self.entries = [PlaylistEntry(self.client, self.id, entry) for entry in data[u'entry']]
-        self.entries = sorted(self.entries, key=lambda entry: entry.position)
+        if self._ordered is None:
+            self.entries._reset()
+            return
+        self._ordered = [entry for entry in self._ordered if entry.id in self._entries_by_id]
+        for position, entry in enumerate(self._ordered, 1):
+            entry.position = position
+        self.entries._reset(self._ordered)
+
+    def entry_for(self, video_id):
+        """ Returns the first entry of `video_id` in this playlist, or None """
+        self._index()
+        entries = self._entries_by_video.get(video_id)
+        return entries[0] if entries else None
 
     def remove_entry(self, entry_id, timeout=None):
-        timeout = timeout or self.client.default_timeout
-        edit_video_url = self.EDIT_VIDEO_URL % {'playlist_id': self.id, 'playlist_entry_id': entry_id}
-        json_response = self.client._gdata_jsonc(edit_video_url, 'DELETE')
-
-        # Remove deleted entry and update entry positions
-        if json_response['status'] == 200:
-            pos_count = 1
-            del_pos = 0
-
-            for i in range(len(self.entries)):
-                if self.entries[i].id == entry_id:
-                    del_pos = i
-                else:
-                    self.entries[i].position = pos_count
-                    pos_count += 1
-            del self.entries[del_pos]
+        if self._delete_entry(entry_id, timeout) == 200:
+            # Remove deleted entry and update entry positions
+            if self._ordered is not None and entry_id in self._entries_by_id:
+                self._remove_from_index(self._entries_by_id[entry_id])
+            self._reconcile()
 
     def remove_video(self, video_id, timeout=None):
-        for entry in self.entries:
-            if entry.video.id == video_id:
-                self.remove_entry(entry.id, timeout)
-                break;
+        entry = self.entry_for(video_id)
+        if entry is not None:
+            self.remove_entry(entry.id, timeout)
+
+    def remove_videos(self, video_ids, concurrency=4, timeout=None):
+        """ Removes the first entry of each of `video_ids` from the playlist.
+
+            Up to `concurrency` entries are deleted at once, over the client's
+            keep-alive connections, and the positions of the remaining entries
+            are updated once all of them are done. Returns a list holding, for
+            each video id, the removed PlaylistEntry or the PlaylistException
+            or AuthenticationError raised removing it; ids not in the playlist
+            map to a PlaylistException too, rather than stopping the rest.
+        """
+        self._index()
+        # pick the entries up front, so a video listed twice removes two
+        # of its entries
+        picked = {}
+        targets = []
+        for video_id in video_ids:
+            entries = self._entries_by_video.get(video_id, ())
+            n = picked.get(video_id, 0)
+            picked[video_id] = n + 1
+            targets.append((video_id, entries[n] if n < len(entries) else None))
+
+        removed = []
+
+        def remove((video_id, entry)):
+            if entry is None:
+                return pytube.exceptions.PlaylistException(
+                    'Video %s is not in playlist %s' % (video_id, self.id))
+            try:
+                status = self._delete_entry(entry.id, timeout)
+            except (pytube.exceptions.AuthenticationError,
+                    pytube.exceptions.PlaylistException), e:
+                return e
+            except (IOError, urllib2.HTTPError), e:
+                return pytube.exceptions.PlaylistException(str(e))
+            if status != 200:
+                return pytube.exceptions.PlaylistException(
+                    'Response Status: %s' % status, {'entry_id': entry.id})
+            removed.append(entry)
+            return entry
+
+        if not targets:
+            return []
+        pool = ThreadPool(min(concurrency, len(targets)))
+        try:
+            results = pool.map(remove, targets)
+        finally:
+            pool.close()
+            pool.join()
+            # even if removing some failed outright, the index must not
+            # keep the entries that are already gone
+            for entry in removed:
+                self._remove_from_index(entry)
+            self._reconcile()
+        return results
+
+    def _delete_entry(self, entry_id, timeout=None):
+        """ Deletes an entry on youtube, returning the response status """
+        timeout = timeout or self.client.default_timeout
+        edit_video_url = self.EDIT_VIDEO_URL % {'playlist_id': self.id, 'playlist_entry_id': entry_id}
+        json_response = self.client._gdata_jsonc(edit_video_url, 'DELETE', headers={}, timeout=timeout)
+        return json_response['status']
 
     def add_video(self, video_id, timeout=None):
-        timeout = timeout or self.client.default_timeout
-        add_video_url = self.ADD_VIDEO_URL % {'playlist_id': self.id}
-        request_body = """<?xml version="1.0" encoding="UTF-8"?>
-<entry xmlns="http://www.w3.org/2005/Atom"
-    xmlns:yt="http://gdata.youtube.com/schemas/2007">
-  <id>%s</id>
-</entry>""" % video_id
-        url = urlparse.urlparse(add_video_url)
-        headers = self.client._default_headers()
-        headers['GData-Version'] = 2
-        headers['Content-Type'] = 'application/atom+xml'
-
-        with contextlib.closing(
-            httplib.HTTPConnection(url.netloc, timeout=timeout)
-            ) as connection:
-            connection.request("POST", '%s?%s' % (url.path, url.query), request_body, headers)
-            response = connection.getresponse()
-            response_body = response.read()
-
-        if response.status != 201:
-            data = {
-                'url': add_video_url,
-                'request_body': request_body,
-                'headers': headers,
-                'response': response,
-                'response_body': response_body
-            }
-            msg = 'Response Status: %s\n%s' % (response.status, response_body)
-            e = pytube.exceptions.PlaylistException(msg, data)
-            raise e
+        self._append(self._post_entry(video_id, timeout))
+        self._reconcile()
+
+    def add_videos(self, video_ids, timeout=None):
+        """ Appends each of `video_ids` to the playlist, in order.
+
+            The entries are added one after another over a single keep-alive
+            connection, so they keep the order they were given in, and the
+            playlist's positions are reconciled once at the end. Returns a
+            list holding, for each video id, the new PlaylistEntry or the
+            PlaylistException raised adding it; a failure doesn't stop the
+            rest.
+        """
+        results = []
+        for video_id in video_ids:
+            try:
+                entry = self._post_entry(video_id, timeout)
+            except pytube.exceptions.PlaylistException, e:
+                results.append(e)
+                continue
+            except (IOError, urllib2.HTTPError), e:
+                results.append(pytube.exceptions.PlaylistException(str(e)))
+                continue
+            self._append(entry)
+            results.append(entry)
+        self._reconcile()
+        return results
+
+    def _append(self, entry):
+        if self._ordered is not None:
+            self._ordered.append(entry)
+            self._add_to_index(entry)
+
+    def _post_entry(self, video_id, timeout=None):
+        """ Adds `video_id` to the playlist on youtube, returning its new
+            PlaylistEntry.
+        """
+        return self._add_mutation(video_id).send(self.client, timeout)
 
-        entry_data = json.loads(response_body)
-        self.entries.append(PlaylistEntry(self.client, self.id, entry_data['entry']))
+    def _add_mutation(self, video_id):
+        return Mutation(
+            "POST", self.ADD_VIDEO_URL % {'playlist_id': self.id},
+            mutations.PLAYLIST_ENTRY % saxutils.escape(video_id).encode('utf-8'), (201,),
+            mutations.playlist_error,
+            result=lambda body: PlaylistEntry(self.client, self.id, json.loads(body)['entry']),
+            apply=self._append, finish=self._reconcile, lane=('playlist', self.id))
 
 
 class Client(object):
@@ -445,6 +945,15 @@ class Client(object):
         You must provide an app identifier to use the youtube API.
         You may also provide a developer API key (http://code.google.com/apis/youtube/dashboard/)
         which will be submitted with all API requests.
+
+        Requests are sent over a pool of keep-alive connections; `pool_size`
+        is the number of idle connections kept per host, and
+        `pool_idle_timeout` is how many seconds an idle connection may be
+        kept before it is discarded.
+
+        Pass a pytube.cache.ResponseCache as `cache` to cache API responses
+        in memory and revalidate them with ETags instead of downloading them
+        again.
     """
 
     GOOGLE_AUTH_URL = 'https://www.google.com/accounts/ClientLogin'
@@ -453,17 +962,40 @@ class Client(object):
     YOUTUBE_PLAYLIST_URL = 'https://gdata.youtube.com/feeds/api/playlists/%(playlist_id)s'
     YOUTUBE_PROFILE_URL = 'http://gdata.youtube.com/feeds/api/users/%(username)s'
     YOUTUBE_UPLOADS_URL = 'http://gdata.youtube.com/feeds/api/users/%(username)s/uploads'
+    YOUTUBE_RELATED_URL = 'http://gdata.youtube.com/feeds/api/videos/%(video_id)s/related'
     YOUTUBE_COMMENTS_URL = 'http://gdata.youtube.com/feeds/api/videos/%(video_id)s/comments'
     YOUTUBE_SUBSCRIBE_URL = 'http://gdata.youtube.com/feeds/api/users/default/subscriptions'
     YOUTUBE_SUBSCRIPTIONS_URL = 'http://gdata.youtube.com/feeds/api/users/%(username)s/subscriptions?alt=json&v=2'
     YOUTUBE_RESPONSE_URL = 'http://gdata.youtube.com/feeds/api/videos/%(original_video_id)s/responses'
 
-    def __init__(self, app_name, dev_key=None):
+    MAX_REDIRECTS = 5
+
+    # url path patterns used to tell which kind of resource a request is for
+    ENDPOINTS = (
+        ('comments', re.compile(r'^/feeds/api/videos/[^/]+/comments')),
+        ('related', re.compile(r'^/feeds/api/videos/[^/]+/related')),
+        ('responses', re.compile(r'^/feeds/api/videos/[^/]+/responses')),
+        ('video', re.compile(r'^/feeds/api/videos/[^/]+$')),
+        ('search', re.compile(r'^/feeds/api/videos/?$')),
+        ('uploads', re.compile(r'^/feeds/api/users/[^/]+/uploads')),
+        ('subscriptions', re.compile(r'^/feeds/api/users/[^/]+/subscriptions')),
+        ('profile', re.compile(r'^/feeds/api/users/[^/]+$')),
+        ('playlist', re.compile(r'^/feeds/api/playlists/')),
+    )
+
+    def __init__(self, app_name, dev_key=None, pool_size=4, pool_idle_timeout=60, cache=None,
+                 quota=None, retry=None, metrics=None):
         self._auth_data = None
         self.username = None
         self.default_timeout = None
         self.app_name = app_name
         self.dev_key = dev_key
+        self.pool = ConnectionPool(maxsize=pool_size, idle_timeout=pool_idle_timeout)
+        self.cache = cache
+        self.quota = quota
+        self.retry = retry
+        self.metrics = metrics
+        self.lazy_videos = False
 
     def _default_headers(self):
         """ Headers that should be added to all gdata requests
@@ -502,14 +1034,82 @@ class Client(object):
             request_url = '%s?%s' % (request_url, params)
             request_url += parsed_url.query
 
-        with contextlib.closing( # Just ensures we close the connection no matter what
-            httplib.HTTPConnection(parsed_url.netloc, timeout=timeout)
-        ) as connection:
-            connection.request(method, request_url, request_body, headers)
-            response = connection.getresponse()
-            return (response.status, response.read())
+        request_url = '%s://%s%s' % (parsed_url.scheme, parsed_url.netloc, request_url)
+        response = self._urlopen(method, request_url, request_body, headers, timeout)
+        return (response.status, response.read())
 
-        return None
+    def _urlopen(self, method, url, body=None, headers=None, timeout=None):
+        """ Sends a request over one of the client's pooled keep-alive
+            connections. Every request the client makes goes through here.
+        """
+        timeout = timeout or self.default_timeout
+        if method != 'GET' and self.cache is not None:
+            # we can't tell which cached responses a change affects
+            self.cache.clear()
+        if self.retry is not None and method == 'GET':
+            return self.retry.call(lambda: self._send(method, url, body, headers, timeout))
+        return self._send(method, url, body, headers, timeout)
+
+    def _send(self, method, url, body, headers, timeout):
+        if self.quota is not None:
+            return self._scheduled_urlopen(method, url, body, headers, timeout)
+        return self._pool_request(method, url, body, headers, timeout)
+
+    def _pool_request(self, method, url, body, headers, timeout):
+        """ Sends a single request, asking for a compressed response """
+        headers = dict(headers or {})
+        headers.setdefault('Accept-Encoding', 'gzip, deflate')
+        # google only compresses responses for user agents that say "gzip"
+        headers.setdefault('User-Agent', '%s (gzip)' % self.app_name)
+        if self.metrics is None:
+            response = self.pool.request(method, url, body, headers, timeout)
+            return self._decompress(response)
+        endpoint = self._endpoint(url, method)
+        started = time.time()
+        try:
+            response = self.pool.request(method, url, body, headers, timeout)
+        except Exception:
+            self.metrics.request(endpoint, 'error', time.time() - started)
+            raise
+        self.metrics.request(endpoint, response.status, time.time() - started)
+        return self._decompress(MeteredResponse(response, self.metrics, endpoint), endpoint)
+
+    def _decompress(self, response, endpoint=None):
+        encoding = (response.getheader('content-encoding') or '').strip().lower()
+        if encoding not in ('gzip', 'deflate'):
+            return response
+        callback = None
+        if self.metrics is not None:
+            callback = lambda saved: self.metrics.count(endpoint, 'bytes_saved', saved)
+        return DecompressingResponse(response, encoding, callback)
+
+    def _scheduled_urlopen(self, method, url, body, headers, timeout):
+        """ Sends a request with whichever developer key the quota
+            scheduler picks, waiting for quota to free up (and trying again)
+            rather than failing with too_many_recent_calls.
+        """
+        resource = self._endpoint(url, method)
+        headers = dict(headers or {})
+        while 1:
+            key = self.quota.acquire(resource)
+            headers['X-GData-Key'] = 'key=' + key
+            response = self._pool_request(method, url, body, headers, timeout)
+            if response.status != 403:
+                return response
+            error = response.read()
+            if 'too_many_recent_calls' not in error:
+                return BufferedResponse(response, error)
+            self.quota.throttled(key)
+
+    def _endpoint(self, url, method='GET'):
+        """ Names the kind of resource a request is for, eg. 'video' """
+        if method != 'GET':
+            return 'mutation'
+        path = urlparse.urlparse(url).path
+        for name, pattern in self.ENDPOINTS:
+            if pattern.match(path):
+                return name
+        return 'other'
 
     def _gdata_jsonc(self, url, method='GET', request_body='', params={}, headers={}, timeout=None):
         headers.update({
@@ -540,29 +1140,95 @@ class Client(object):
         headers = headers or {}
         headers.update(self._default_headers())
 
-        request = urllib2.Request(url, data, headers)
-        try:
-            return urllib2.urlopen(request, timeout=timeout)
-        except urllib2.HTTPError, e:
+        method = 'GET' if data is None else 'POST'
+        if data is not None:
+            headers.setdefault('Content-Type', 'application/x-www-form-urlencoded')
+
+        response = self._urlopen(method, url, data, headers, timeout)
+        redirects = 0
+        while (method == 'GET' and response.status in (301, 302, 303, 307)
+               and redirects < self.MAX_REDIRECTS):
+            response.read()
+            url = urlparse.urljoin(url, response.getheader('location'))
+            response = self._urlopen(method, url, None, headers, timeout)
+            redirects += 1
+
+        if not 200 <= response.status < 300:
+            # keep raising the same errors urllib2 did, so callers can keep
+            # inspecting e.code and e.read()
+            e = urllib2.HTTPError(url, response.status, response.reason,
+                response.msg, StringIO.StringIO(response.read()))
             if e.getcode() == 401:
                 e.response = e.read()
                 if 'TokenExpired' in e.response:
                     raise pytube.exceptions.TokenExpired()
                 raise e
-            raise
+            raise e
+        return response
 
-    def _gdata_json(self, url, query=None, data=None, headers=None, timeout=None):
+    def _gdata_json(self, url, query=None, data=None, headers=None, timeout=None, alt='json'):
         query = query or {}
-        query.update({'alt': 'json'})
-        return json.load(
-            self._gdata_request(
-                url,
-                query=query,
-                data=data,
-                headers=headers,
-                timeout=timeout
-            )
+        query.update({'alt': alt})
+        if self.cache is not None and data is None:
+            return self._cached_json(url, query, headers, timeout)
+        response = self._gdata_request(
+            url,
+            query=query,
+            data=data,
+            headers=headers,
+            timeout=timeout
         )
+        return self._decode_json(url, response.read(), 'GET' if data is None else 'POST')
+
+    def _decode_json(self, url, body, method='GET'):
+        """ json.loads, timed into the client's metrics """
+        if self.metrics is None:
+            return json.loads(body)
+        started = time.time()
+        data = json.loads(body)
+        self.metrics.observe(self._endpoint(url, method), 'decode', time.time() - started)
+        return data
+
+    def _gdata_json_stream(self, url, query=None, headers=None, timeout=None, alt='json'):
+        """ Like _gdata_json, but returns a FeedParser that yields the entries
+            of the feed while the response is still being downloaded.
+            Streamed responses are never cached.
+        """
+        query = query or {}
+        query.update({'alt': alt})
+        response = self._gdata_request(url, query=query, headers=headers, timeout=timeout)
+        if alt == 'jsonc':
+            return FeedParser(response, container=u'data', items=u'items')
+        return FeedParser(response)
+
+    def _cached_json(self, url, query, headers=None, timeout=None):
+        """ Serves a GET from the response cache, revalidating stale
+            responses with If-None-Match.
+        """
+        key = (url, tuple(sorted(query.items())), self._auth_headers().get('Authorization'))
+        entry, fresh = self.cache.lookup(key)
+        if fresh:
+            if self.metrics is not None:
+                self.metrics.count(self._endpoint(url), 'cache_hits')
+            return entry.value
+
+        headers = dict(headers or {})
+        if entry is not None and entry.etag:
+            headers['If-None-Match'] = entry.etag
+        try:
+            response = self._gdata_request(url, query=query, headers=headers, timeout=timeout)
+        except urllib2.HTTPError, e:
+            if e.code == 304 and entry is not None:
+                self.cache.revalidate(key, self._endpoint(url))
+                if self.metrics is not None:
+                    self.metrics.count(self._endpoint(url), 'cache_revalidations')
+                return entry.value
+            raise
+
+        body = response.read()
+        data = self._decode_json(url, body)
+        self.cache.store(key, data, response.getheader('etag'), len(body), self._endpoint(url))
+        return data
 
     def _auth_headers(self):
         if self._auth_data is None:
@@ -655,11 +1321,15 @@ class Client(object):
         data = self._gdata_json(self.YOUTUBE_PROFILE_URL % {'username': username })
         return Profile(self, data)
 
-    def user_videos(self, username='default'):
+    def user_videos(self, username='default', fields=None, format='json'):
         """ Gets a user's uploaded video stream. If authenticated, may be
             called without passing a username to get your own videos.
+
+            `fields` is a partial response selector for each video, and
+            `format` the response format to use; see Stream.
         """
-        return VideoStream(self, self.YOUTUBE_UPLOADS_URL % {'username': username })
+        return VideoStream(self, self.YOUTUBE_UPLOADS_URL % {'username': username },
+                           fields=fields, format=format)
 
     def user_subscriptions(self, username='default'):
         """ Gets YouTube channel ids that username is following. If
@@ -668,63 +1338,230 @@ class Client(object):
         """
         return SubscriptionStream(self, self.YOUTUBE_SUBSCRIPTIONS_URL % {'username': username })
 
-    def video(self, video_id):
+    def video(self, video_id, fields=None):
         """ Gets a specific video from the youtube API.
+
+            Pass a GData partial response selector as `fields`, such as
+            'title,yt:statistics', to only fetch those parts of the video;
+            attributes that weren't fetched are left unset.
         """
+        return self._get_video(video_id, fields)
+
+    def videos(self, video_ids, concurrency=10):
+        """ Gets many videos at once.
+
+            Returns a dict mapping each distinct video id to its Video. Ids
+            that can't be fetched map to the exception video() would have
+            raised for them (QuotaException, PrivateVideoException,
+            NoSuchVideoException, ...) instead of aborting the whole lookup.
+            Up to `concurrency` videos are requested at once.
+        """
+        seen = set()
+        video_ids = [v for v in video_ids if not (v in seen or seen.add(v))]
+        if not video_ids:
+            return {}
+
+        def fetch(video_id):
+            try:
+                return self._get_video(video_id)
+            except (pytube.exceptions.VideoException, urllib2.HTTPError), e:
+                return e
+
+        pool = ThreadPool(min(concurrency, len(video_ids)))
+        try:
+            return dict(zip(video_ids, pool.map(fetch, video_ids)))
+        finally:
+            pool.close()
+            pool.join()
+
+    def comments_for(self, videos, concurrency=10, ordered=False, limit=None):
+        """ Reads the comments on many videos at once.
+
+            `videos` may hold Videos or video ids. Yields a (video_id, Comment)
+            tuple for every comment, as soon as it has been fetched; with
+            `ordered` set, all of a video's comments are yielded before the
+            next video's, in the order the videos were given. At most `limit`
+            comments are read from each video.
+
+            Up to `concurrency` videos' comments are fetched at once. A video
+            whose comments can't be fetched yields a single (video_id,
+            exception) tuple instead of aborting the rest.
+        """
+        streams = []
+        for video in videos:
+            if isinstance(video, Video):
+                # a fresh stream, so the video's own comments are left alone,
+                # that knows how many comments to expect
+                stream = self.video_comments(video.id)
+                stream._count = video.comments._count
+                streams.append((video.id, stream))
+            else:
+                streams.append((video, self.video_comments(video)))
+        if not streams:
+            return iter(())
+        if ordered:
+            return self._comments_ordered(streams, concurrency, limit)
+        return self._comments_unordered(streams, concurrency, limit)
+
+    def _read_comments(self, stream, limit):
+        # only one page of each stream needs to be held at a time
+        stream.window = 1
+        return itertools.islice(stream, limit)
+
+    def _comments_ordered(self, streams, concurrency, limit):
+        def read((video_id, stream)):
+            try:
+                return video_id, list(self._read_comments(stream, limit))
+            except (pytube.exceptions.VideoException, urllib2.HTTPError), e:
+                return video_id, e
+
+        pool = ThreadPool(min(concurrency, len(streams)))
+        # only `concurrency` videos are read ahead of the one being yielded,
+        # so finished comment lists can't pile up faster than they are read
+        streams = iter(streams)
+        ahead = collections.deque(pool.apply_async(read, (item,))
+                                  for item in itertools.islice(streams, concurrency))
+        try:
+            while ahead:
+                video_id, comments = ahead.popleft().get()
+                for item in itertools.islice(streams, 1):
+                    ahead.append(pool.apply_async(read, (item,)))
+                if isinstance(comments, Exception):
+                    yield video_id, comments
+                    continue
+                for comment in comments:
+                    yield video_id, comment
+        finally:
+            pool.terminate()
+
+    def _comments_unordered(self, streams, concurrency, limit):
+        # keeps workers from running too far ahead of the caller
+        results = Queue.Queue(maxsize=concurrency * Stream.MAX_PAGE_SIZE)
+        stopped = threading.Event()
+        done, failed = object(), object()
+
+        def put(item):
+            while not stopped.is_set():
+                try:
+                    results.put(item, timeout=0.1)
+                    return True
+                except Queue.Full:
+                    pass
+            return False
+
+        def read((video_id, stream)):
+            if stopped.is_set():
+                # the caller has gone; don't start on another video
+                return
+            try:
+                for comment in self._read_comments(stream, limit):
+                    if not put((video_id, comment)):
+                        return
+            except (pytube.exceptions.VideoException, urllib2.HTTPError), e:
+                put((video_id, e))
+            except Exception:
+                # anything else is re-raised to the caller
+                put((failed, sys.exc_info()))
+            put(done)
+
+        pool = ThreadPool(min(concurrency, len(streams)))
         try:
-            data = self._gdata_json(self.YOUTUBE_VIDEO_URL % {'video_id': video_id}, {'v': 2})
+            pool.map_async(read, streams)
+            remaining = len(streams)
+            while remaining:
+                item = results.get()
+                if item is done:
+                    remaining -= 1
+                elif item[0] is failed:
+                    raise item[1][0], item[1][1], item[1][2]
+                else:
+                    yield item
+        finally:
+            stopped.set()
+            pool.terminate()
+
+    def _get_video(self, video_id, fields=None):
+        query = {'v': 2}
+        if fields:
+            query['fields'] = Video.selector(fields)
+        try:
+            data = self._gdata_json(self.YOUTUBE_VIDEO_URL % {'video_id': video_id}, query)
         except urllib2.HTTPError, e:
-            if e.code == 403:
-                e.response = e.read()
-                if 'too_many_recent_calls' in e.response:
-                    raise pytube.exceptions.QuotaException
-                raise pytube.exceptions.PrivateVideoException
-            if e.code == 404:
-                raise pytube.exceptions.NoSuchVideoException
-            raise
-        return Video(self, data[u'entry'])
-
-    def video_search(self, q=None, **query):
+            raise self._video_error(e)
+        if self.metrics is None:
+            return Video(self, data[u'entry'])
+        started = time.time()
+        video = Video(self, data[u'entry'])
+        self.metrics.observe('video', 'build', time.time() - started)
+        return video
+
+    def _video_error(self, e):
+        """ Maps an HTTPError from a video lookup onto a pytube exception """
+        if e.code == 403:
+            e.response = e.read()
+            if 'too_many_recent_calls' in e.response:
+                return pytube.exceptions.QuotaException()
+            return pytube.exceptions.PrivateVideoException()
+        if e.code == 404:
+            return pytube.exceptions.NoSuchVideoException()
+        return e
+
+    def video_search(self, q=None, fields=None, format='json', **query):
         """ Searches YouTube for videos matching a search term
+
+            `fields` is a partial response selector for each video, and
+            `format` the response format to use; see Stream.
         """
         query['q'] = q
-        return VideoStream(self, self.YOUTUBE_SEARCH_URL, query=query)
+        return VideoStream(self, self.YOUTUBE_SEARCH_URL, query=query, fields=fields, format=format)
 
     def video_comments(self, video_id):
         """ Gets Comments for a specific video
         """
         return CommentStream(self, self.YOUTUBE_COMMENTS_URL % {'video_id': video_id})
 
-    def video_responses(self, video_id):
-        return VideoStream(self, self.YOUTUBE_RESPONSE_URL % {'original_video_id': video_id})
+    def video_responses(self, video_id, format='json'):
+        return VideoStream(self, self.YOUTUBE_RESPONSE_URL % {'original_video_id': video_id},
+                           format=format)
+
+    def related_videos(self, video_id, format='json'):
+        """ Gets the videos youtube believes are related to a video
+        """
+        return VideoStream(self, self.YOUTUBE_RELATED_URL % {'video_id': video_id}, format=format)
+
+    def _link_stream(self, uri):
+        """ The VideoStream for a video feed linked to from an entry """
+        return VideoStream(self, uri)
 
     def subscribe(self, username='default'):
         """Subscribes the authenticated user to username's channels
         """
+        self._subscribe_mutation(username).perform(self)
+
+    def _subscribe_mutation(self, username):
         assert self._auth_data is not None, "You must be authenticated to subscribe"
-        subscribe_data = \
-        '''<?xml version="1.0" encoding="UTF-8"?>
-        <entry xmlns="http://www.w3.org/2005/Atom"
-          xmlns:yt="http://gdata.youtube.com/schemas/2007">
-            <category scheme="http://gdata.youtube.com/schemas/2007/subscriptiontypes.cat"
-              term="channel"/>
-            <yt:username>{0}</yt:username>
-        </entry>'''.format(username)
-        subscribe_headers = { 'Content-Type': 'application/atom+xml'}
-        response = self._gdata_request(self.YOUTUBE_SUBSCRIBE_URL, None, subscribe_data, subscribe_headers)
+        return Mutation('POST', self.YOUTUBE_SUBSCRIBE_URL,
+                        mutations.SUBSCRIBE % saxutils.escape(username).encode('utf-8'))
 
     def video_response(self, original_video_id, response_video_id):
-        response_data = \
-        '''<?xml version="1.0" encoding="UTF-8"?>
-        <entry xmlns="http://www.w3.org/2005/Atom">
-          <id>{0}</id>
-        </entry>'''.format(response_video_id)
-        response_headers = { 'Content-Type': 'application/atom+xml'}
-        response = self._gdata_request(self.YOUTUBE_RESPONSE_URL % {'original_video_id': original_video_id }, None, response_data, response_headers)
+        self._video_response_mutation(original_video_id, response_video_id).perform(self)
+
+    def _video_response_mutation(self, original_video_id, response_video_id):
+        return Mutation('POST', self.YOUTUBE_RESPONSE_URL % {'original_video_id': original_video_id },
+                        mutations.VIDEO_RESPONSE % saxutils.escape(response_video_id).encode('utf-8'))
+
+    def mutations(self, batch_size=50, concurrency=4, timeout=None):
+        """ Returns a MutationQueue for sending many updates, subscriptions,
+            video responses and playlist additions at once; see
+            pytube.mutations.
+        """
+        return MutationQueue(self, batch_size, concurrency, timeout)
 
     def playlist(self, playlist_id):
+        # the first page of entries comes with the playlist
+        query = {'v': 2, 'start-index': 1, 'max-results': PlaylistEntryStream.MAX_PAGE_SIZE}
         try:
-            data = self._gdata_json(self.YOUTUBE_PLAYLIST_URL % {'playlist_id': playlist_id}, {'v': 2})
+            data = self._gdata_json(self.YOUTUBE_PLAYLIST_URL % {'playlist_id': playlist_id}, query)
         except urllib2.HTTPError, e:
             raise
         return Playlist(self, data)
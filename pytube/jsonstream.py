@@ -0,0 +1,132 @@
+try: import simplejson as json
+except ImportError: import json
+import re
+
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class _Reader(object):
+    """ Reads JSON values and structural characters off a file-like object,
+        pulling more data into its buffer only when it needs it.
+    """
+
+    def __init__(self, fp, chunk_size):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def fill(self):
+        if self.eof:
+            return False
+        data = self.fp.read(self.chunk_size)
+        if not data:
+            self.eof = True
+            return False
+        # drop everything we've already consumed
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """ Returns the next non-whitespace character, without consuming it """
+        while 1:
+            self.pos = WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                raise ValueError("Unexpected end of JSON data")
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError("Expected %r at position %d" % (char, self.pos))
+        self.pos += 1
+
+    def value(self):
+        """ Decodes the next complete JSON value """
+        self.peek()
+        while 1:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except ValueError:
+                # most likely the value is cut off at the end of the buffer
+                if not self.fill():
+                    raise
+                continue
+            # a number at the very end of the buffer may not be finished yet
+            if end < len(self.buf) or not self.fill():
+                self.pos = end
+                return value
+
+    def members(self):
+        """ Walks an object, yielding each key; the caller must consume the
+            key's value before asking for the next one.
+        """
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while 1:
+            key = self.value()
+            self.expect(':')
+            yield key
+            separator = self.peek()
+            self.pos += 1
+            if separator == '}':
+                return
+            if separator != ',':
+                raise ValueError("Expected ',' or '}' at position %d" % (self.pos - 1))
+
+    def elements(self):
+        """ Walks an array, yielding each of its values """
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while 1:
+            yield self.value()
+            separator = self.peek()
+            self.pos += 1
+            if separator == ']':
+                return
+            if separator != ',':
+                raise ValueError("Expected ',' or ']' at position %d" % (self.pos - 1))
+
+
+class FeedParser(object):
+    """ Incrementally parses a youtube JSON feed read from a file-like object.
+
+        Iterating a FeedParser yields each entry of the feed as soon as it
+        has been read, without waiting for (or holding on to) the rest of the
+        response. Once iteration is finished, `document` holds the rest of
+        the response, with the entries left out.
+
+        `container` and `items` name the object holding the entries and the
+        list of entries within it; `feed` and `entry` for alt=json feeds.
+    """
+
+    def __init__(self, fp, container=u'feed', items=u'entry', chunk_size=8192):
+        self.fp = fp
+        self.container = container
+        self.items = items
+        self.chunk_size = chunk_size
+        self.document = None
+
+    def __iter__(self):
+        reader = _Reader(self.fp, self.chunk_size)
+        document = {}
+        for key in reader.members():
+            if key != self.container or reader.peek() != '{':
+                document[key] = reader.value()
+                continue
+            container = document[key] = {}
+            for inner_key in reader.members():
+                if inner_key == self.items and reader.peek() == '[':
+                    for item in reader.elements():
+                        yield item
+                else:
+                    container[inner_key] = reader.value()
+        self.document = document
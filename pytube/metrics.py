@@ -0,0 +1,219 @@
+import threading
+
+from pytube.utils import Slotted
+
+# upper bounds, in seconds, of the latency histogram buckets
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+TIMINGS = ('request', 'decode', 'build')
+
+
+class Histogram(Slotted):
+    """ Counts observations into buckets by their upper bound """
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                return
+
+    def cumulative(self):
+        """ (upper bound, observations <= bound) pairs, ending with +Inf """
+        total = 0
+        pairs = []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            pairs.append((bound, total))
+        pairs.append((float('inf'), self.count))
+        return pairs
+
+
+class EndpointMetrics(Slotted):
+    """ Everything recorded for one endpoint """
+    __slots__ = ('statuses', 'bytes', 'counters', 'timings')
+
+    def __init__(self, buckets):
+        self.statuses = {}
+        self.bytes = 0
+        self.counters = {}
+        self.timings = dict((name, Histogram(buckets)) for name in TIMINGS)
+
+
+class Metrics(object):
+    """ Records what a client spends its time on, per endpoint (one of the
+        names returned by Client._endpoint, eg. 'video' or 'mutation').
+
+        For every endpoint the registry counts requests by status code and
+        response bytes, and keeps histograms of the time spent waiting for
+        responses ('request'), decoding JSON ('decode') and turning it into
+        models ('build'). Cache hits and revalidations are counted too.
+
+        `callback`, if given, is called as callback(endpoint, name, value)
+        for every observation, eg. to forward them to statsd. A registry may
+        be shared between threads and clients.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, callback=None):
+        self.buckets = tuple(buckets)
+        self.callback = callback
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _get(self, endpoint):
+        metrics = self._endpoints.get(endpoint)
+        if metrics is None:
+            metrics = self._endpoints[endpoint] = EndpointMetrics(self.buckets)
+        return metrics
+
+    def request(self, endpoint, status, seconds):
+        """ Records a response, and how long it took to arrive """
+        with self._lock:
+            metrics = self._get(endpoint)
+            metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+            metrics.timings['request'].observe(seconds)
+        if self.callback is not None:
+            self.callback(endpoint, 'status', status)
+            self.callback(endpoint, 'request', seconds)
+
+    def received(self, endpoint, size):
+        """ Records `size` bytes of response body """
+        with self._lock:
+            self._get(endpoint).bytes += size
+        if self.callback is not None:
+            self.callback(endpoint, 'bytes', size)
+
+    def observe(self, endpoint, name, seconds):
+        """ Records the time spent in 'decode' or 'build' """
+        with self._lock:
+            self._get(endpoint).timings[name].observe(seconds)
+        if self.callback is not None:
+            self.callback(endpoint, name, seconds)
+
+    def count(self, endpoint, name, value=1):
+        """ Adds to a counter, eg. 'cache_hits' """
+        with self._lock:
+            counters = self._get(endpoint).counters
+            counters[name] = counters.get(name, 0) + value
+        if self.callback is not None:
+            self.callback(endpoint, name, value)
+
+    def clear(self):
+        with self._lock:
+            self._endpoints = {}
+
+    def snapshot(self):
+        """ Returns everything recorded so far as plain dicts, keyed by
+            endpoint.
+        """
+        with self._lock:
+            snapshot = {}
+            for endpoint, metrics in self._endpoints.iteritems():
+                snapshot[endpoint] = {
+                    'requests': sum(metrics.statuses.itervalues()),
+                    'statuses': dict(metrics.statuses),
+                    'bytes': metrics.bytes,
+                    'counters': dict(metrics.counters),
+                    'timings': dict((name, {
+                        'count': histogram.count,
+                        'sum': histogram.sum,
+                        'buckets': histogram.cumulative(),
+                    }) for name, histogram in metrics.timings.iteritems()),
+                }
+            return snapshot
+
+    def prometheus(self, prefix='pytube'):
+        """ Renders the registry in the Prometheus text exposition format """
+        snapshot = self.snapshot()
+        endpoints = sorted(snapshot)
+        lines = []
+
+        def header(name, kind, help):
+            lines.append('# HELP %s_%s %s' % (prefix, name, help))
+            lines.append('# TYPE %s_%s %s' % (prefix, name, kind))
+
+        header('requests_total', 'counter', 'Responses received, by status code.')
+        for endpoint in endpoints:
+            for status, count in sorted(snapshot[endpoint]['statuses'].iteritems()):
+                lines.append('%s_requests_total{endpoint="%s",status="%s"} %d' % (
+                    prefix, endpoint, status, count))
+
+        header('response_bytes_total', 'counter', 'Bytes of response bodies received.')
+        for endpoint in endpoints:
+            lines.append('%s_response_bytes_total{endpoint="%s"} %d' % (
+                prefix, endpoint, snapshot[endpoint]['bytes']))
+
+        for name, help in (('request', 'Time spent waiting for responses.'),
+                           ('decode', 'Time spent decoding JSON.'),
+                           ('build', 'Time spent building models.')):
+            metric = '%s_%s_seconds' % (prefix, name)
+            header('%s_seconds' % name, 'histogram', help)
+            for endpoint in endpoints:
+                timing = snapshot[endpoint]['timings'][name]
+                if not timing['count']:
+                    continue
+                for bound, count in timing['buckets']:
+                    le = '+Inf' if bound == float('inf') else repr(float(bound))
+                    lines.append('%s_bucket{endpoint="%s",le="%s"} %d' % (metric, endpoint, le, count))
+                lines.append('%s_sum{endpoint="%s"} %r' % (metric, endpoint, timing['sum']))
+                lines.append('%s_count{endpoint="%s"} %d' % (metric, endpoint, timing['count']))
+
+        counters = sorted(set(name for endpoint in endpoints
+                              for name in snapshot[endpoint]['counters']))
+        for name in counters:
+            header('%s_total' % name, 'counter', name.replace('_', ' ').capitalize() + '.')
+            for endpoint in endpoints:
+                if name in snapshot[endpoint]['counters']:
+                    lines.append('%s_%s_total{endpoint="%s"} %d' % (
+                        prefix, name, endpoint, snapshot[endpoint]['counters'][name]))
+        return '\n'.join(lines) + '\n'
+
+
+class MeteredResponse(object):
+    """ Counts the body bytes read from a response into a Metrics registry """
+
+    def __init__(self, response, metrics, endpoint):
+        self._response = response
+        self._metrics = metrics
+        self._endpoint = endpoint
+        self.status = response.status
+        self.reason = response.reason
+        self.msg = response.msg
+
+    def getheader(self, name, default=None):
+        return self._response.getheader(name, default)
+
+    def getheaders(self):
+        return self._response.getheaders()
+
+    def getcode(self):
+        return self.status
+
+    def info(self):
+        return self.msg
+
+    def read(self, amt=None):
+        data = self._response.read(amt)
+        if data:
+            self._metrics.received(self._endpoint, len(data))
+        return data
+
+    def close(self):
+        self._response.close()
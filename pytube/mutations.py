@@ -0,0 +1,264 @@
+""" Writes to the YouTube API: updating videos, subscribing, posting video
+    responses and adding to playlists.
+
+    Each write is prepared as a Mutation, which can be sent on its own or
+    queued on a MutationQueue to be sent with many others.
+"""
+from multiprocessing.pool import ThreadPool
+import StringIO
+import urllib2
+
+from pytube.utils import Slotted
+import pytube.exceptions
+
+
+# request bodies, filled in with the % operator; every value must already be
+# escaped and utf-8 encoded
+VIDEO_UPDATE = """<?xml version="1.0"?>
+<entry xmlns="http://www.w3.org/2005/Atom"
+  xmlns:media="http://search.yahoo.com/mrss/"
+  xmlns:yt="http://gdata.youtube.com/schemas/2007">
+  <media:group>
+    <media:title type="plain">%(title)s</media:title>
+    <media:description type="plain">%(description)s</media:description>
+    <media:category scheme="http://gdata.youtube.com/schemas/2007/categories.cat">%(category)s</media:category>
+    <media:keywords>%(keywords)s</media:keywords>
+    %(private)s
+  </media:group>
+%(accessControl)s
+</entry>
+"""
+ACCESS_CONTROL = """  <yt:accessControl action="%s" permission="%s"/>"""
+SUBSCRIBE = """<?xml version="1.0" encoding="UTF-8"?>
+<entry xmlns="http://www.w3.org/2005/Atom"
+  xmlns:yt="http://gdata.youtube.com/schemas/2007">
+  <category scheme="http://gdata.youtube.com/schemas/2007/subscriptiontypes.cat"
+    term="channel"/>
+  <yt:username>%s</yt:username>
+</entry>"""
+VIDEO_RESPONSE = """<?xml version="1.0" encoding="UTF-8"?>
+<entry xmlns="http://www.w3.org/2005/Atom">
+  <id>%s</id>
+</entry>"""
+PLAYLIST_ENTRY = """<?xml version="1.0" encoding="UTF-8"?>
+<entry xmlns="http://www.w3.org/2005/Atom"
+    xmlns:yt="http://gdata.youtube.com/schemas/2007">
+  <id>%s</id>
+</entry>"""
+
+
+def http_error(mutation, response, body):
+    """ The urllib2.HTTPError _gdata_request would have raised """
+    if response.status == 401 and 'TokenExpired' in body:
+        return pytube.exceptions.TokenExpired()
+    return urllib2.HTTPError(mutation.url, response.status, response.reason,
+                             response.msg, StringIO.StringIO(body))
+
+
+def _error_data(mutation, response, body):
+    return {
+        'url': mutation.url,
+        'request_body': mutation.body,
+        'headers': mutation.headers,
+        'response': response,
+        'response_body': body,
+    }
+
+
+def video_update_error(mutation, response, body):
+    msg = 'Response Status: %s\n%s' % (response.status, body)
+    return pytube.exceptions.VideoUpdateException(msg, _error_data(mutation, response, body))
+
+
+def playlist_error(mutation, response, body):
+    msg = 'Response Status: %s\n%s' % (response.status, body)
+    return pytube.exceptions.PlaylistException(msg, _error_data(mutation, response, body))
+
+
+class Mutation(object):
+    """ A prepared write to the API.
+
+        `statuses` are the response statuses that mean success (any 2xx by
+        default); any other status is turned into an exception by `error`,
+        called with (mutation, response, body). On success `result` is
+        called with the response body and its return value is the result of
+        the mutation.
+
+        Mutations sent by a MutationQueue may run on any thread; `apply`,
+        called with the result, and `finish`, called once per flush however
+        many mutations share it, always run on the thread that flushed the
+        queue, in queue order. Mutations with the same `lane` are sent one
+        after another, in order, instead of concurrently.
+    """
+    __slots__ = ('method', 'url', 'body', 'headers', 'statuses', 'error', 'result', 'apply',
+                 'finish', 'lane')
+
+    def __init__(self, method, url, body, statuses=None, error=http_error, result=None,
+                 apply=None, finish=None, lane=None):
+        self.method = method
+        # edit urls come from the API as unicode, which httplib can't mix
+        # with a utf-8 encoded body
+        self.url = url.encode('utf-8') if isinstance(url, unicode) else url
+        self.body = body
+        self.headers = None
+        self.statuses = statuses
+        self.error = error
+        self.result = result
+        self.apply = apply
+        self.finish = finish
+        self.lane = lane
+
+    def send(self, client, timeout=None):
+        """ Sends the mutation, returning its result or raising its error.
+            `apply` and `finish` are left to the caller.
+        """
+        headers = client._default_headers()
+        headers['GData-Version'] = 2
+        headers['Content-Type'] = 'application/atom+xml'
+        self.headers = headers
+        response = client._urlopen(self.method, self.url, self.body, headers,
+                                   timeout or client.default_timeout)
+        body = response.read()
+        if self.statuses is None:
+            ok = 200 <= response.status < 300
+        else:
+            ok = response.status in self.statuses
+        if not ok:
+            raise self.error(self, response, body)
+        if self.result is not None:
+            return self.result(body)
+        return None
+
+    def perform(self, client, timeout=None):
+        """ Sends the mutation and applies its result right away """
+        value = self.send(client, timeout)
+        if self.apply is not None:
+            self.apply(value)
+        if self.finish is not None:
+            self.finish()
+        return value
+
+
+class MutationResult(Slotted):
+    """ The outcome of a queued mutation. Once its queue has been flushed,
+        `value` holds its result, or `error` the exception it raised.
+    """
+    __slots__ = ('mutation', 'value', 'error', 'done')
+
+    def __init__(self, mutation):
+        self.mutation = mutation
+        self.value = None
+        self.error = None
+        self.done = False
+
+    @property
+    def ok(self):
+        return self.done and self.error is None
+
+    def __repr__(self):
+        if not self.done:
+            state = 'pending'
+        elif self.error is not None:
+            state = 'failed: %s' % (type(self.error).__name__,)
+        else:
+            state = 'done'
+        return '<MutationResult %s %s %s>' % (self.mutation.method, self.mutation.url, state)
+
+
+class MutationQueue(object):
+    """ Collects mutations and sends them in batches.
+
+        Up to `concurrency` mutations are sent at once, over the client's
+        keep-alive connections; the queue flushes itself whenever
+        `batch_size` mutations are waiting. A mutation that fails doesn't
+        stop the rest: each one reports its own result or error on the
+        MutationResult returned when it was queued, and flush returns those
+        of every mutation it sent. Used as a context manager, the queue is
+        flushed on the way out.
+    """
+
+    def __init__(self, client, batch_size=50, concurrency=4, timeout=None):
+        self.client = client
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.pending = []
+
+    def __len__(self):
+        return len(self.pending)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if exc_info[0] is None:
+            self.flush()
+
+    def put(self, mutation):
+        """ Queues a Mutation, returning its MutationResult """
+        result = MutationResult(mutation)
+        self.pending.append(result)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+        return result
+
+    def update(self, video):
+        """ Queues Video.update for `video` """
+        return self.put(video._update_mutation())
+
+    def subscribe(self, username):
+        """ Queues Client.subscribe for `username` """
+        return self.put(self.client._subscribe_mutation(username))
+
+    def video_response(self, original_video_id, response_video_id):
+        """ Queues Client.video_response """
+        return self.put(self.client._video_response_mutation(original_video_id, response_video_id))
+
+    def add_to_playlist(self, playlist, video_id):
+        """ Queues Playlist.add_video; additions to a playlist keep their
+            order.
+        """
+        return self.put(playlist._add_mutation(video_id))
+
+    def flush(self):
+        """ Sends every queued mutation, returning their MutationResults """
+        batch, self.pending = self.pending, []
+        if not batch:
+            return []
+        # mutations sharing a lane go through one worker, in order
+        lanes = []
+        by_lane = {}
+        for result in batch:
+            lane = result.mutation.lane
+            if lane is None:
+                lanes.append([result])
+            elif lane in by_lane:
+                by_lane[lane].append(result)
+            else:
+                by_lane[lane] = [result]
+                lanes.append(by_lane[lane])
+        pool = ThreadPool(min(self.concurrency, len(lanes)))
+        try:
+            pool.map(self._send_lane, lanes)
+        finally:
+            pool.close()
+            pool.join()
+
+        finish = []
+        for result in batch:
+            mutation = result.mutation
+            if result.error is None and mutation.apply is not None:
+                mutation.apply(result.value)
+            if mutation.finish is not None and mutation.finish not in finish:
+                finish.append(mutation.finish)
+        for func in finish:
+            func()
+        return batch
+
+    def _send_lane(self, results):
+        for result in results:
+            try:
+                result.value = result.mutation.send(self.client, self.timeout)
+            except Exception, e:
+                result.error = e
+            result.done = True
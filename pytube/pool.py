@@ -0,0 +1,301 @@
+import httplib
+import select
+import socket
+import StringIO
+import threading
+import time
+import urlparse
+import zlib
+
+
+class PooledResponse(object):
+    """ Wraps an httplib response that was sent over a pooled connection.
+
+        Once the body has been read to the end the connection is handed back
+        to its pool so the next request to the same host can reuse the
+        socket. Closing a response before it has been fully read discards the
+        connection, since there would be unread bytes left on the wire.
+    """
+
+    def __init__(self, pool, key, connection, response):
+        self._pool = pool
+        self._key = key
+        self._connection = connection
+        self._response = response
+        self.status = response.status
+        self.reason = response.reason
+        self.msg = response.msg
+
+    def getheader(self, name, default=None):
+        return self._response.getheader(name, default)
+
+    def getheaders(self):
+        return self._response.getheaders()
+
+    def getcode(self):
+        """ urllib2 compatible alias for status """
+        return self.status
+
+    def info(self):
+        """ urllib2 compatible access to the response headers """
+        return self.msg
+
+    def read(self, amt=None):
+        if self._connection is None:
+            return ''
+        if amt is None:
+            data = self._response.read()
+        else:
+            data = self._response.read(amt)
+        if self._response.isclosed():
+            self._release()
+        return data
+
+    def close(self):
+        if self._connection is None:
+            return
+        connection, self._connection = self._connection, None
+        self._response.close()
+        connection.close()
+
+    def _release(self):
+        connection, self._connection = self._connection, None
+        if self._response.will_close:
+            connection.close()
+        else:
+            self._pool._release(self._key, connection)
+
+
+class BufferedResponse(object):
+    """ A response whose body has already been read off the wire, eg. to
+        look at an error before deciding whether to retry the request.
+    """
+
+    def __init__(self, response, body):
+        self._response = response
+        self._body = StringIO.StringIO(body)
+        self.status = response.status
+        self.reason = response.reason
+        self.msg = response.msg
+
+    def getheader(self, name, default=None):
+        return self._response.getheader(name, default)
+
+    def getheaders(self):
+        return self._response.getheaders()
+
+    def getcode(self):
+        return self.status
+
+    def info(self):
+        return self.msg
+
+    def read(self, amt=None):
+        if amt is None:
+            return self._body.read()
+        return self._body.read(amt)
+
+    def close(self):
+        self._body.close()
+
+
+class DecompressingResponse(object):
+    """ Decodes a gzip or deflate encoded response as it is read.
+
+        The body is pulled off the wire and decompressed a chunk at a time,
+        so neither the whole compressed body nor a second copy of the
+        decompressed one is ever held. `callback`, if given, is called with
+        the number of bytes compression saved on each chunk.
+    """
+
+    chunk_size = 16384
+
+    def __init__(self, response, encoding, callback=None):
+        self._response = response
+        self._encoding = encoding
+        self._callback = callback
+        self._decoder = zlib.decompressobj(16 + zlib.MAX_WBITS if encoding == 'gzip' else zlib.MAX_WBITS)
+        self._started = False
+        self._buffer = ''
+        self._eof = False
+        self.status = response.status
+        self.reason = response.reason
+        self.msg = response.msg
+
+    def getheader(self, name, default=None):
+        return self._response.getheader(name, default)
+
+    def getheaders(self):
+        return self._response.getheaders()
+
+    def getcode(self):
+        return self.status
+
+    def info(self):
+        return self.msg
+
+    def read(self, amt=None):
+        if amt is None:
+            chunks = [self._buffer]
+            while not self._eof:
+                chunks.append(self._decode_chunk())
+            self._buffer = ''
+            return ''.join(chunks)
+        while len(self._buffer) < amt and not self._eof:
+            self._buffer += self._decode_chunk()
+        data, self._buffer = self._buffer[:amt], self._buffer[amt:]
+        return data
+
+    def close(self):
+        self._response.close()
+
+    def _decode_chunk(self):
+        data = self._response.read(self.chunk_size)
+        if not data:
+            self._eof = True
+            decoded = self._decoder.flush()
+        else:
+            try:
+                decoded = self._decoder.decompress(data)
+            except zlib.error:
+                if self._started or self._encoding != 'deflate':
+                    raise
+                # some servers send raw deflate data, without the zlib header
+                self._decoder = zlib.decompressobj(-zlib.MAX_WBITS)
+                decoded = self._decoder.decompress(data)
+            self._started = True
+        if self._callback is not None:
+            self._callback(len(decoded) - len(data))
+        return decoded
+
+
+class ConnectionPool(object):
+    """ Keeps idle HTTP/1.1 keep-alive connections around, per host, so that
+        consecutive requests can reuse sockets instead of paying for a new
+        TCP (and TLS) handshake every time.
+
+        At most `maxsize` idle connections are kept for each host; connections
+        that have been idle for longer than `idle_timeout` seconds, or whose
+        socket has been closed by the server, are thrown away instead of being
+        reused. A pool may be shared between threads.
+    """
+
+    connection_classes = {
+        'http': httplib.HTTPConnection,
+        'https': httplib.HTTPSConnection,
+    }
+
+    # methods that can be sent again after a stale connection fails,
+    # without risking the server acting on them twice
+    IDEMPOTENT_METHODS = ('GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS')
+
+    def __init__(self, maxsize=4, idle_timeout=60):
+        self.maxsize = maxsize
+        self.idle_timeout = idle_timeout
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # open sockets and locks can't be pickled; an unpickled pool starts
+        # out empty.
+        return {'maxsize': self.maxsize, 'idle_timeout': self.idle_timeout}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def request(self, method, url, body=None, headers=None, timeout=None):
+        """ Sends a request and returns a PooledResponse.
+
+            The body of the response must be read (or the response closed)
+            before the underlying connection can be reused.
+        """
+        parsed_url = urlparse.urlparse(url)
+        key = (parsed_url.scheme or 'http', parsed_url.netloc)
+        path = parsed_url.path or '/'
+        if parsed_url.query:
+            path = '%s?%s' % (path, parsed_url.query)
+        headers = headers or {}
+
+        connection, reused = self._get_connection(key, timeout)
+        sent = False
+        try:
+            connection.request(method, path, body, headers)
+            sent = True
+            response = connection.getresponse()
+        except (socket.error, httplib.HTTPException):
+            connection.close()
+            if not reused or (sent and method not in self.IDEMPOTENT_METHODS):
+                raise
+            # the server may have dropped an idle connection between our
+            # health check and the request; try again on a fresh socket.
+            # Once the request has gone out the server may have acted on
+            # it, so only requests that are safe to repeat are retried.
+            connection = self._new_connection(key, timeout)
+            try:
+                connection.request(method, path, body, headers)
+                response = connection.getresponse()
+            except:
+                connection.close()
+                raise
+        return PooledResponse(self, key, connection, response)
+
+    def clear(self):
+        """ Closes every idle connection held by this pool """
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.itervalues():
+            for connection, last_used in connections:
+                connection.close()
+
+    def _new_connection(self, key, timeout):
+        scheme, netloc = key
+        try:
+            cls = self.connection_classes[scheme]
+        except KeyError:
+            raise ValueError("Unsupported url scheme: %s" % scheme)
+        if timeout is None:
+            timeout = socket.getdefaulttimeout()
+        return cls(netloc, timeout=timeout)
+
+    def _get_connection(self, key, timeout):
+        """ Returns a (connection, reused) tuple for the given host """
+        now = time.time()
+        while 1:
+            with self._lock:
+                connections = self._idle.get(key)
+                if not connections:
+                    break
+                connection, last_used = connections.pop()
+            if (now - last_used > self.idle_timeout or
+                not self._is_healthy(connection)):
+                connection.close()
+                continue
+            if timeout is None:
+                timeout = socket.getdefaulttimeout()
+            connection.timeout = timeout
+            connection.sock.settimeout(timeout)
+            return connection, True
+        return self._new_connection(key, timeout), False
+
+    def _release(self, key, connection):
+        with self._lock:
+            connections = self._idle.setdefault(key, [])
+            if len(connections) < self.maxsize:
+                connections.append((connection, time.time()))
+                return
+        connection.close()
+
+    @staticmethod
+    def _is_healthy(connection):
+        """ An idle keep-alive socket should have nothing to read. If it is
+            readable, the server has either closed it or sent something we
+            weren't expecting; either way it can't be reused.
+        """
+        sock = connection.sock
+        if sock is None:
+            return False
+        try:
+            readable, _, _ = select.select([sock], [], [], 0)
+        except (select.error, socket.error, ValueError):
+            return False
+        return not readable
@@ -0,0 +1,137 @@
+import threading
+import time
+
+import pytube.exceptions
+
+
+class KeyBudget(object):
+    """ The token bucket for one developer key """
+    __slots__ = ('key', 'tokens', 'updated', 'blocked_until', 'requests', 'throttled', 'parked')
+
+    def __init__(self, key, tokens, now):
+        self.key = key
+        self.tokens = tokens
+        self.updated = now
+        self.blocked_until = 0
+        self.requests = 0
+        self.throttled = 0
+        self.parked = 0.0
+
+
+class QuotaScheduler(object):
+    """ Spreads requests over one or more youtube developer keys, keeping
+        each key within its quota.
+
+        Every key gets a token bucket that refills at `rate` requests per
+        second and holds at most `burst` tokens. A request takes its tokens
+        from whichever key has the most to spare; when no key has enough
+        the request is parked until one does, rather than failing. `costs`
+        gives the number of tokens a request takes per resource (one of the
+        names returned by Client._endpoint, eg. 'video' or 'mutation'), 1 by
+        default.
+
+        If youtube still answers too_many_recent_calls, the key is emptied
+        and left alone for `cooldown` seconds. Requests that have been parked
+        for `max_wait` seconds raise QuotaException; by default they wait for
+        as long as it takes. A scheduler may be shared between threads and
+        clients.
+    """
+
+    def __init__(self, keys, rate=1.0, burst=10, costs=None, cooldown=60, max_wait=None):
+        if isinstance(keys, basestring):
+            keys = [keys]
+        if not keys:
+            raise ValueError("At least one developer key is required")
+        self.keys = list(keys)
+        self.rate = float(rate)
+        self.burst = burst
+        self.costs = costs or {}
+        self.cooldown = cooldown
+        self.max_wait = max_wait
+        now = time.time()
+        self._budgets = [KeyBudget(key, burst, now) for key in self.keys]
+        self._condition = threading.Condition()
+
+    def __getstate__(self):
+        # usage is not carried over; an unpickled scheduler starts out with
+        # full buckets.
+        return {'keys': self.keys, 'rate': self.rate, 'burst': self.burst,
+                'costs': self.costs, 'cooldown': self.cooldown, 'max_wait': self.max_wait}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def acquire(self, resource=None):
+        """ Takes the tokens for one request, parking until a key has enough
+            of them, and returns the developer key to send it with.
+        """
+        cost = min(self.costs.get(resource, 1), self.burst)
+        started = time.time()
+        with self._condition:
+            while 1:
+                now = time.time()
+                budget, wait = self._best(cost, now)
+                if not wait:
+                    budget.tokens -= cost
+                    budget.requests += 1
+                    budget.parked += now - started
+                    return budget.key
+                if self.max_wait is not None:
+                    remaining = started + self.max_wait - now
+                    if remaining <= 0:
+                        budget.parked += now - started
+                        raise pytube.exceptions.QuotaException()
+                    wait = min(wait, remaining)
+                self._condition.wait(wait)
+
+    def throttled(self, key, cooldown=None):
+        """ Youtube said `key` has made too many recent calls """
+        with self._condition:
+            for budget in self._budgets:
+                if budget.key == key:
+                    budget.tokens = 0
+                    budget.throttled += 1
+                    budget.blocked_until = time.time() + (self.cooldown if cooldown is None else cooldown)
+            self._condition.notify_all()
+
+    def usage(self):
+        """ Reports, for every key, the tokens it has left, the requests it
+            has made, how often youtube throttled it and how many seconds
+            requests spent parked waiting for it.
+        """
+        with self._condition:
+            now = time.time()
+            usage = {}
+            for budget in self._budgets:
+                self._refill(budget, now)
+                usage[budget.key] = {
+                    'tokens': budget.tokens,
+                    'burst': self.burst,
+                    'rate': self.rate,
+                    'requests': budget.requests,
+                    'throttled': budget.throttled,
+                    'parked_seconds': budget.parked,
+                    'blocked_seconds': max(0, budget.blocked_until - now),
+                }
+            return usage
+
+    def _refill(self, budget, now):
+        if now < budget.blocked_until:
+            budget.updated = now
+            return
+        elapsed = now - max(budget.updated, budget.blocked_until)
+        budget.tokens = min(self.burst, budget.tokens + elapsed * self.rate)
+        budget.updated = now
+
+    def _best(self, cost, now):
+        """ Returns (budget, seconds to wait) for the key that can serve a
+            request the soonest; keys with the most tokens to spare win.
+        """
+        best, best_wait = None, None
+        for budget in self._budgets:
+            self._refill(budget, now)
+            wait = max(0, budget.blocked_until - now, (cost - budget.tokens) / self.rate)
+            if (best is None or wait < best_wait or
+                (wait == best_wait and budget.tokens > best.tokens)):
+                best, best_wait = budget, wait
+        return best, best_wait
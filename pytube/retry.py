@@ -0,0 +1,194 @@
+import collections
+import httplib
+import Queue
+import random
+import socket
+import sys
+import threading
+import time
+
+
+class RetryPolicy(object):
+    """ Decides when and how a client sends an idempotent request again.
+
+        Requests that fail with a socket error or timeout, or that youtube
+        answers with one of `statuses`, are sent again up to `retries` times.
+        Before each retry the client sleeps for a random time of up to
+        `backoff` seconds, doubling with every attempt up to `max_backoff`
+        (or for as long as a Retry-After header asks).
+
+        Retries are paid for from a budget, so a struggling server isn't
+        swamped with them: every request adds `budget_ratio` to the budget
+        and every retry takes one from it; the budget never holds more than
+        `budget_reserve`.
+
+        With `hedge_percentile` set (eg. 95), a request that takes longer
+        than that percentile of recent requests is sent a second time, and
+        whichever answers first is used. Hedged requests are paid for from
+        the retry budget too.
+
+        A policy keeps state, so each client should have its own.
+    """
+
+    def __init__(self, retries=3, backoff=0.5, max_backoff=30, statuses=(500, 502, 503, 504),
+                 budget_ratio=0.2, budget_reserve=10, hedge_percentile=None, hedge_samples=20):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.statuses = frozenset(statuses)
+        self.budget_ratio = budget_ratio
+        self.budget_reserve = budget_reserve
+        self.hedge_percentile = hedge_percentile
+        self.hedge_samples = hedge_samples
+        self.budget = float(budget_reserve)
+        self.requests = 0
+        self.retried = 0
+        self.hedged = 0
+        self.hedges_won = 0
+        self.exhausted = 0
+        self._latencies = collections.deque(maxlen=200)
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def call(self, send):
+        """ Calls `send` (which sends the request and returns its response)
+            until it succeeds, retries run out or the budget does. The last
+            response is returned, or the last error raised.
+        """
+        with self._lock:
+            self.requests += 1
+            self.budget = min(self.budget_reserve, self.budget + self.budget_ratio)
+        attempt = 0
+        while 1:
+            try:
+                response = self._attempt(send)
+            except (socket.error, httplib.HTTPException):
+                if not self._may_retry(attempt):
+                    raise
+                delay = self._delay(attempt)
+            else:
+                if response.status not in self.statuses or not self._may_retry(attempt):
+                    return response
+                delay = self._delay(attempt, response.getheader('retry-after'))
+                # the connection can only be reused once the body is read
+                response.read()
+            time.sleep(delay)
+            attempt += 1
+
+    def stats(self):
+        """ Reports the number of requests, retries and hedged requests made,
+            how many hedges won, how often the budget ran out and the budget
+            left.
+        """
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'retries': self.retried,
+                'hedged': self.hedged,
+                'hedges_won': self.hedges_won,
+                'budget_exhausted': self.exhausted,
+                'budget': self.budget,
+            }
+
+    def _may_retry(self, attempt):
+        if attempt >= self.retries:
+            return False
+        if not self._withdraw():
+            return False
+        with self._lock:
+            self.retried += 1
+        return True
+
+    def _withdraw(self):
+        with self._lock:
+            if self.budget < 1:
+                self.exhausted += 1
+                return False
+            self.budget -= 1
+            return True
+
+    def _delay(self, attempt, retry_after=None):
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(self.max_backoff, int(retry_after)))
+        return delay
+
+    def _hedge_delay(self):
+        if self.hedge_percentile is None:
+            return None
+        with self._lock:
+            if len(self._latencies) < self.hedge_samples:
+                return None
+            latencies = sorted(self._latencies)
+        index = int(len(latencies) * self.hedge_percentile / 100.0)
+        return latencies[min(index, len(latencies) - 1)]
+
+    def _attempt(self, send):
+        started = time.time()
+        delay = self._hedge_delay()
+        if delay is None:
+            response = send()
+        else:
+            response = self._hedged(send, delay)
+        with self._lock:
+            self._latencies.append(time.time() - started)
+        return response
+
+    def _hedged(self, send, delay):
+        """ Sends the request, and sends it again if there's no answer within
+            `delay` seconds; returns the first response to arrive.
+        """
+        results = Queue.Queue()
+
+        def run(hedge):
+            try:
+                results.put((hedge, send(), None))
+            except Exception:
+                results.put((hedge, None, sys.exc_info()))
+
+        self._start(run, False)
+        try:
+            outcomes = [results.get(timeout=delay)]
+            sent = 1
+        except Queue.Empty:
+            outcomes = []
+            sent = 1
+            if self._withdraw():
+                with self._lock:
+                    self.hedged += 1
+                self._start(run, True)
+                sent = 2
+
+        # prefer the first response; only fail if every attempt failed
+        while not outcomes or (outcomes[-1][2] is not None and len(outcomes) < sent):
+            outcomes.append(results.get())
+        hedge, response, error = outcomes[-1]
+        if len(outcomes) < sent:
+            self._start(lambda hedge: self._discard(results), None)
+        if error is not None:
+            raise error[0], error[1], error[2]
+        if hedge:
+            with self._lock:
+                self.hedges_won += 1
+        return response
+
+    @staticmethod
+    def _discard(results):
+        """ Closes the response of a request that lost the race """
+        hedge, response, error = results.get()
+        if response is not None:
+            response.close()
+
+    @staticmethod
+    def _start(target, hedge):
+        thread = threading.Thread(target=target, args=(hedge,))
+        thread.daemon = True
+        thread.start()
@@ -0,0 +1,414 @@
+""" A compact, versioned binary format for pytube's models.
+
+    Unlike pickle, records only hold the data that came from youtube: no
+    client, no child streams and no attribute names. Rebinding a record to a
+    client when it is loaded is cheap, since child streams (comments, related
+    videos, ...) are only built when they are first used.
+
+    Single records are made with dumps/loads (or the to_bytes/from_bytes
+    methods on the models); many records can be written to and read back
+    from a file with RecordWriter and RecordReader.
+"""
+try: import simplejson as json
+except ImportError: import json
+import codecs
+import datetime
+import struct
+
+from pytube.client import Category, Comment, PlaylistEntry, Profile, Video
+from pytube.utils import intern_string
+
+MAGIC = 'PYT'
+VERSION = 2
+
+# field kinds
+INT, BOOL, TIME, STR, LIST, MAP, JSON, BYTES = range(8)
+NUMERIC = (INT, BOOL, TIME)
+
+EPOCH = datetime.datetime(1970, 1, 1)
+SEPARATOR = u'\x00'
+
+_header = struct.Struct('<BBI')
+# version 1 records didn't say how many fields they hold
+_v1_header = struct.Struct('<BI')
+_length = struct.Struct('<I')
+_utf8_decode = codecs.utf_8_decode
+
+
+def _to_micros(dt):
+    delta = dt - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def _from_micros(micros):
+    return EPOCH + datetime.timedelta(microseconds=micros)
+
+
+def _json_default(value):
+    if isinstance(value, datetime.datetime):
+        return {'$dt': _to_micros(value)}
+    raise TypeError(repr(value))
+
+
+def _json_hook(obj):
+    if len(obj) == 1 and '$dt' in obj:
+        return _from_micros(obj['$dt'])
+    return obj
+
+
+def _decode_str(value):
+    return _utf8_decode(value)[0]
+
+
+def _decode_list(value):
+    return _utf8_decode(value)[0].split(SEPARATOR) if value else []
+
+
+def _decode_map(value):
+    items = _utf8_decode(value)[0].split(SEPARATOR) if value else []
+    return dict(zip(items[::2], items[1::2]))
+
+
+def _decode_json(value):
+    return json.loads(value, object_hook=_json_hook)
+
+
+DECODERS = {
+    INT: None,
+    BOOL: bool,
+    TIME: _from_micros,
+    STR: _decode_str,
+    LIST: _decode_list,
+    MAP: _decode_map,
+    JSON: _decode_json,
+    BYTES: None,
+}
+
+
+def _getter(name):
+    def get(obj):
+        return getattr(obj, name, None)
+    return get
+
+
+def _setter(name):
+    def setter(obj, value, extra):
+        setattr(obj, name, value)
+    return setter
+
+
+def _interned_setter(name):
+    # keep sharing repeated strings between loaded objects, as the models
+    # built from API responses do
+    def setter(obj, value, extra):
+        if isinstance(value, list):
+            value = [intern_string(v) for v in value]
+        else:
+            value = intern_string(value)
+        setattr(obj, name, value)
+    return setter
+
+
+class Schema(object):
+    """ Describes how one model class is laid out in a record.
+
+        `fields` is a list of (name, kind) tuples, optionally followed by a
+        getter (obj -> value, None when missing) and a setter
+        (obj, value, extra -> None). `finish`, if given, is called with
+        (obj, client, extra, version) once every field has been set; setters
+        can leave things for it in the `extra` dict.
+
+        A record body is a type byte, the number of fields it holds and a
+        bitmap of the fields present, followed by every numeric field as a
+        64 bit integer, the byte lengths of every other field, and finally
+        their utf-8 encoded contents. Fields may only ever be appended to a
+        schema, and never more than 32; records written before a field was
+        added simply don't hold it. `v1_fields` is the number of fields
+        records in the version 1 format, which didn't store it, hold.
+    """
+
+    def __init__(self, type_code, cls, fields, finish=None, v1_fields=0):
+        assert len(fields) <= 32
+        self.type_code = type_code
+        self.cls = cls
+        self.finish = finish
+        self.fields = []
+        for field in fields:
+            name, kind = field[:2]
+            getter = field[2] if len(field) > 2 else _getter(name)
+            setter = field[3] if len(field) > 3 else _setter(name)
+            self.fields.append((name, kind, getter, setter))
+        self.v1_fields = v1_fields
+        self.numeric = [(i, f) for i, f in enumerate(self.fields) if f[1] in NUMERIC]
+        self.packed = [(i, f) for i, f in enumerate(self.fields) if f[1] not in NUMERIC]
+        self.numbers = struct.Struct('<%dq' % len(self.numeric))
+        self.lengths = struct.Struct('<%dI' % len(self.packed))
+        self._layouts = {}
+
+    def _layout(self, count):
+        """ The (numbers, lengths, decoders) to read a record holding the
+            first `count` fields with; decoders are (bit, decoder, setter)
+            for each field, in the order they are read.
+        """
+        layout = self._layouts.get(count)
+        if layout is None:
+            if count > len(self.fields):
+                raise ValueError("%s record from a newer version of pytube" % self.cls.__name__)
+            numeric = [(i, f) for i, f in self.numeric if i < count]
+            packed = [(i, f) for i, f in self.packed if i < count]
+            layout = self._layouts[count] = (
+                struct.Struct('<%dq' % len(numeric)),
+                struct.Struct('<%dI' % len(packed)),
+                [(1 << i, DECODERS[f[1]], f[3]) for i, f in numeric + packed],
+            )
+        return layout
+
+    def encode(self, obj):
+        present = 0
+        numbers = []
+        for i, (name, kind, get, setter) in self.numeric:
+            value = get(obj)
+            if value is None:
+                numbers.append(0)
+                continue
+            present |= 1 << i
+            if kind == TIME:
+                value = _to_micros(value)
+            numbers.append(int(value))
+        chunks = []
+        for i, (name, kind, get, setter) in self.packed:
+            value = get(obj)
+            if value is None:
+                chunks.append('')
+                continue
+            present |= 1 << i
+            if kind == STR:
+                value = value.encode('utf-8')
+            elif kind == LIST:
+                value = SEPARATOR.join(value).encode('utf-8')
+            elif kind == MAP:
+                value = SEPARATOR.join(SEPARATOR.join(item) for item in value.iteritems()).encode('utf-8')
+            elif kind == JSON:
+                value = json.dumps(value, default=_json_default, separators=(',', ':'))
+            chunks.append(value)
+        return ''.join([
+            _header.pack(self.type_code, len(self.fields), present),
+            self.numbers.pack(*numbers),
+            self.lengths.pack(*[len(c) for c in chunks]),
+        ] + chunks)
+
+    def decode(self, data, client=None, offset=0, version=VERSION):
+        """ Builds an object from the record body at data[offset:], written
+            in format `version`
+        """
+        if version == 1:
+            type_code, present = _v1_header.unpack_from(data, offset)
+            count = self.v1_fields
+            offset += _v1_header.size
+        else:
+            type_code, count, present = _header.unpack_from(data, offset)
+            offset += _header.size
+        if type_code != self.type_code:
+            raise ValueError("Expected a %s record" % self.cls.__name__)
+        numbers, lengths, decoders = self._layout(count)
+        values = list(numbers.unpack_from(data, offset))
+        offset += numbers.size
+        sizes = lengths.unpack_from(data, offset)
+        offset += lengths.size
+
+        for length in sizes:
+            values.append(data[offset:offset + length])
+            offset += length
+
+        obj = self.cls.__new__(self.cls)
+        extra = {}
+        for (bit, decoder, setter), value in zip(decoders, values):
+            if present & bit:
+                setter(obj, value if decoder is None else decoder(value), extra)
+        if self.finish is not None:
+            self.finish(obj, client, extra, version)
+        return obj
+
+
+def _links(obj):
+    links = getattr(obj, '_links', None)
+    if links is None:
+        return None
+    return dict((name, body[u'href']) for name, body in links.iteritems() if u'href' in body)
+
+
+# Video
+
+def _set_video_links(video, links, extra):
+    extra[u'link'] = [{u'rel': name, u'href': href} for name, href in links.iteritems()]
+
+def _category_label(video):
+    return getattr(getattr(video, 'category', None), 'label', None)
+
+def _set_category_label(video, label, extra):
+    video.category = Category.get(video.category, label)
+
+def _set_comment_count(video, count, extra):
+    video.comment_count = count
+    extra[u'gd$comments'] = {u'gd$feedLink': {u'countHint': count}}
+
+def _finish_video(video, client, extra, version):
+    # child streams are built the first time they're used, just like with
+    # lazily decoded videos.
+    video.client = client
+    video._data = extra
+    video._pending = set(['_decode_comments'])
+    if u'link' in extra:
+        video._pending.add('_decode_links')
+
+VIDEO = Schema(1, Video, [
+    ('id', STR),
+    ('api_id', STR),
+    ('title', STR),
+    ('author', STR, _getter('author'), _interned_setter('author')),
+    ('category', STR, lambda v: getattr(v, 'category', None) and unicode(v.category)),
+    ('category_label', STR, _category_label, _set_category_label),
+    ('keywords', LIST, _getter('keywords'), _interned_setter('keywords')),
+    ('description', STR),
+    ('updated', TIME),
+    ('published', TIME),
+    ('uploaded', TIME),
+    ('duration', INT),
+    ('aspect_ratio', STR, _getter('aspect_ratio'), _interned_setter('aspect_ratio')),
+    ('private', BOOL),
+    ('access_control', MAP),
+    ('like_count', INT),
+    ('dislike_count', INT),
+    ('favorite_count', INT),
+    ('view_count', INT),
+    ('comment_count', INT, _getter('comment_count'), _set_comment_count),
+    ('links', MAP, _links, _set_video_links),
+], finish=_finish_video, v1_fields=21)
+
+
+# Profile
+
+def _feed_counts(profile):
+    return dict((feed, getattr(profile, feed + '_count'))
+                for feed in profile.feed_types if hasattr(profile, feed + '_count'))
+
+def _set_feed_counts(profile, counts, extra):
+    for feed, count in counts.iteritems():
+        setattr(profile, feed + '_count', count)
+
+def _finish_profile(profile, client, extra, version):
+    profile.client = client
+    profile._parse_links([{u'rel': name, u'href': href}
+                          for name, href in extra.get('links', {}).iteritems()])
+
+PROFILE = Schema(2, Profile, [
+    ('id', STR),
+    ('api_id', STR),
+    ('thumbnail', STR),
+    ('title', STR),
+    ('updated', TIME),
+    ('author', JSON),
+    ('statistics', JSON),
+    ('feeds', MAP),
+    ('feed_counts', JSON, _feed_counts, _set_feed_counts),
+    ('links', MAP, _links, lambda p, links, extra: extra.update(links=links)),
+], finish=_finish_profile, v1_fields=10)
+
+
+# Comment
+
+COMMENT = Schema(3, Comment, [
+    ('id', STR),
+    ('author', STR),
+    ('title', STR),
+    ('content', STR),
+    ('published', TIME),
+    ('updated', TIME),
+], v1_fields=6)
+
+
+# PlaylistEntry
+
+def _finish_entry(entry, client, extra, version):
+    entry.video = VIDEO.decode(extra['video'], client, version=version)
+
+PLAYLIST_ENTRY = Schema(4, PlaylistEntry, [
+    ('id', STR),
+    ('api_id', STR),
+    ('playlist_id', STR),
+    ('position', INT),
+    ('video', BYTES, lambda e: VIDEO.encode(e.video), lambda e, data, extra: extra.update(video=data)),
+], finish=_finish_entry, v1_fields=5)
+
+
+SCHEMAS = dict((schema.type_code, schema) for schema in (VIDEO, PROFILE, COMMENT, PLAYLIST_ENTRY))
+SCHEMAS_BY_CLASS = dict((schema.cls, schema) for schema in SCHEMAS.itervalues())
+
+
+def _schema_for(obj):
+    for cls in type(obj).__mro__:
+        if cls in SCHEMAS_BY_CLASS:
+            return SCHEMAS_BY_CLASS[cls]
+    raise TypeError("Can't serialize %r" % (obj,))
+
+
+def _check_header(data):
+    """ Returns the format version of the records after the header at the
+        start of `data`, and the offset they start at
+    """
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError("Not a pytube record")
+    version = ord(data[len(MAGIC)])
+    if version > VERSION:
+        raise ValueError("Unsupported pytube record version: %d" % version)
+    return version, len(MAGIC) + 1
+
+
+def dumps(obj):
+    """ Serializes a Video, Profile, Comment or PlaylistEntry """
+    return MAGIC + chr(VERSION) + _schema_for(obj).encode(obj)
+
+
+def loads(data, client=None):
+    """ Loads an object serialized with dumps, bound to `client` """
+    version, offset = _check_header(data)
+    return SCHEMAS[ord(data[offset])].decode(data, client, offset, version)
+
+
+class RecordWriter(object):
+    """ Writes a sequence of records to a file-like object """
+
+    def __init__(self, fp):
+        self.fp = fp
+        self.fp.write(MAGIC + chr(VERSION))
+
+    def write(self, obj):
+        body = _schema_for(obj).encode(obj)
+        self.fp.write(_length.pack(len(body)) + body)
+
+    def write_all(self, objs):
+        for obj in objs:
+            self.write(obj)
+
+
+class RecordReader(object):
+    """ Reads records written by a RecordWriter back, bound to `client` """
+
+    def __init__(self, fp, client=None):
+        self.fp = fp
+        self.client = client
+        self.version = _check_header(self.fp.read(len(MAGIC) + 1))[0]
+
+    def __iter__(self):
+        read = self.fp.read
+        while 1:
+            header = read(_length.size)
+            if not header:
+                return
+            if len(header) < _length.size:
+                raise ValueError("Truncated pytube record")
+            length, = _length.unpack(header)
+            body = read(length)
+            if len(body) < length:
+                raise ValueError("Truncated pytube record")
+            yield SCHEMAS[ord(body[0])].decode(body, self.client, version=self.version)
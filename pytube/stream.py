@@ -1,5 +1,10 @@
+from multiprocessing.pool import ThreadPool
+import time
+
+
 class YtData(object):
     """Provides some base functions for parsing common youtube responses"""
+    __slots__ = ()
 
     feed_types = {
         'favorites': u'http://gdata.youtube.com/schemas/2007#user.favorites',
@@ -32,44 +37,107 @@ class Stream(YtData):
         youtube API via the normal python index/slice notation.
 
         Maintains an internal results cache in order to minimize youtube API
-        hits.
+        hits. Results are fetched and cached a whole page at a time, so
+        reading any result also caches the ones around it.
+
+        Slices spanning several pages are fetched one page at a time unless
+        `concurrency` is greater than 1, in which case up to that many pages
+        are requested at once.
+
+        When `incremental` is set, iterating the stream yields each result
+        as soon as it has been downloaded and decoded, instead of waiting for
+        the rest of its page.
+
+        When `window` is set, iterating the stream keeps no more than that
+        many pages cached, dropping the pages that have already been read.
+        Reading an evicted result fetches its page again.
+
+        `fields` is a GData partial response selector, such as
+        'id,title,yt:statistics', applied to each entry of the feed. Only
+        the selected parts of each entry are downloaded and decoded.
+
+        `format` is the API response format to ask for: 'json', or the
+        lighter 'jsonc' for streams that know how to handle it.
+
+        When `prefetch` is set, iterating the stream requests the next page
+        in the background while the results of the current one are being
+        read. It has no effect on incremental streams.
     """
 
     # constants enforced by the API
     MAX_PAGE_SIZE = 50
     MAX_RESULTS = 1000
 
-    def __init__(self, client, uri, query=None):
+    def __init__(self, client, uri, query=None, concurrency=1, incremental=False, window=None,
+                 fields=None, format='json', prefetch=False):
         self.client = client
         self.uri = uri
         self.query = query or {}
+        self.concurrency = concurrency
+        self.incremental = incremental
+        self.window = window
+        self.fields = fields
+        self.format = format
+        self.prefetch = prefetch
 
-        self._result_cache = []
+        # page number -> the results on that page; pages are MAX_PAGE_SIZE
+        # results long, and page n holds results n * MAX_PAGE_SIZE onwards
+        self._pages = {}
+        # the page number of the first short page, which ends the stream
+        self._last_page = None
         self._count = None
 
     def __len__(self):
         return self.count
 
     def __iter__(self):
-        i = 0
-        exhausted = False
-        while 1:
-            while i < len(self._result_cache):
-                yield self._result_cache[i]
-                i += 1
-            if ((self._count is not None and i >= self._count) or
-                len(self._result_cache) == self.MAX_RESULTS or
-                exhausted):
-                raise StopIteration
-            if self._fill_cache(self.MAX_PAGE_SIZE) < self.MAX_PAGE_SIZE:
-                exhausted = True
+        if self.prefetch and not self.incremental:
+            return self._iter_prefetching()
+        return self._iter_pages()
+
+    def _iter_pages(self):
+        number = 0
+        while not self._past_end(number):
+            self._evict(number)
+            if self.incremental and number not in self._pages:
+                page = self._stream_page(number)
+            else:
+                page = self._get_page(number)
+            for item in page:
+                yield item
+            number += 1
+
+    def _iter_prefetching(self):
+        """ Iterates the stream, fetching each page while the one before it
+            is being read.
+        """
+        pool = ThreadPool(1)
+        try:
+            number = 0
+            ahead = None
+            while not self._past_end(number):
+                self._evict(number)
+                if number not in self._pages:
+                    if ahead is not None and ahead[0] == number:
+                        self._store_page(number, self._build(ahead[1].get()))
+                    else:
+                        self._load_pages([number])
+                following = number + 1
+                ahead = None
+                if following not in self._pages and not self._past_end(following):
+                    ahead = following, pool.apply_async(self._fetch_page, (self._page_range(following),))
+                for item in self._pages.get(number, ()):
+                    yield item
+                number += 1
+        finally:
+            pool.close()
 
     def __getitem__(self, key):
         if not isinstance(key, (int, long, slice)):
             raise TypeError
         if ((not isinstance(key, slice) and (key < 0))
-            or (isinstance(key, slice) and ((key.start or 0) < 0)
-                and ((key.stop or 0) < 0))):
+            or (isinstance(key, slice) and ((key.start or 0) < 0
+                                            or (key.stop or 0) < 0))):
             raise ValueError("Negative indexing is not supported")
 
         if isinstance(key, (int, long)):
@@ -79,20 +147,7 @@ class Stream(YtData):
                     "Video Stream" % self.MAX_RESULTS)
             if self._count is not None and self._count < key:
                 raise IndexError
-            if key < len(self._result_cache):
-                return self._result_cache[key]
-            # Can we get the key as part of a query that will fill the next
-            # chunk of our result cache?
-            if key <= len(self._result_cache) + self.MAX_PAGE_SIZE:
-                self._fill_cache(self.MAX_PAGE_SIZE)
-                return self._result_cache[key]
             return self.get_at_index(key)
-
-        if key.stop <= len(self._result_cache):
-            return self._result_cache[key]
-        if key.start <= len(self._result_cache) + self.MAX_PAGE_SIZE:
-            self._fill_cache(key.stop - len(self._result_cache))
-            return self._result_cache[key]
         return self.get_slice(key)
 
     @property
@@ -106,47 +161,202 @@ class Stream(YtData):
          """
         if self._count is not None:
             return self._count
-        self._fill_cache(self.MAX_PAGE_SIZE)
+        self._get_page(0)
         return self._count
 
     def get_at_index(self, index):
-        query = self.query.copy()
-        query.update({'max-results': 1, 'start-index': index, 'v': 2})
-        data = self.client._gdata_json(self.uri, query)
-        if u'entry' in data[u'feed']:
-            return self._handle_data(data)[0]
-        raise IndexError
+        """ Returns the result at `index`, fetching the page holding it """
+        page = self._get_page(index // self.MAX_PAGE_SIZE)
+        return page[index % self.MAX_PAGE_SIZE]
 
     def get_slice(self, key):
-        # youtube results are 1-indexed, while python slices are 0-indexed.
-        # offset start and stop by 1
-        start, stop =  key.start + 1, key.stop + 1
-        index = start
+        """ Returns the results in slice `key`, fetching (and caching) every
+            page it covers that isn't cached yet.
+        """
+        start = key.start or 0
+        stop = self.MAX_RESULTS if key.stop is None else min(key.stop, self.MAX_RESULTS)
+        if start >= stop:
+            return []
+        size = self.MAX_PAGE_SIZE
+        first, last = start // size, (stop - 1) // size
+        self._load_pages([n for n in xrange(first, last + 1) if n not in self._pages])
         results = []
-        while index < stop:
-            query = self.query.copy()
-            query.update({
-                'max-results': min(stop - index, 50),
-                'start-index': index,
-                'v': 2
-            })
-            data = self._handle_data(self.client._gdata_json(self.uri, query))
-            index += len(data)
-            results += data
-            if len(data) < query['max-results']: break
-        return results
-
-    def _fill_cache(self, count):
-        start = len(self._result_cache)
-        stop = start + count
-        data = self.get_slice(slice(start, stop))
-        self._result_cache += data
-        return len(data)
+        for number in xrange(first, last + 1):
+            page = self._pages.get(number)
+            if page is None:
+                break
+            results += page
+            if number == self._last_page:
+                break
+        offset = first * size
+        return results[start - offset:stop - offset:key.step]
+
+    def _get_page(self, number):
+        """ Returns the results on page `number`, fetching it if needed """
+        page = self._pages.get(number)
+        if page is None:
+            if self._past_end(number):
+                return []
+            self._load_pages([number])
+            page = self._pages.get(number, [])
+        return page
+
+    def _load_pages(self, numbers):
+        """ Fetches and caches the given pages, in order, stopping at the end
+            of the stream.
+
+            Pages are fetched one at a time unless `concurrency` is greater
+            than 1, in which case they are fetched in waves of that many
+            requests. Pages in a wave are handled in order once the wave
+            completes; anything fetched past the end of the stream is dropped.
+        """
+        numbers = [n for n in numbers if not self._past_end(n)]
+        if not numbers:
+            return
+        if self.concurrency <= 1 or len(numbers) == 1:
+            for number in numbers:
+                if self._past_end(number):
+                    return
+                self._store_page(number, self._build(self._fetch_page(self._page_range(number))))
+            return
+        pool = ThreadPool(min(self.concurrency, len(numbers)))
+        try:
+            for i in xrange(0, len(numbers), self.concurrency):
+                # don't ask for pages we already know are past the end
+                wave = [n for n in numbers[i:i + self.concurrency] if not self._past_end(n)]
+                if not wave:
+                    return
+                pages = pool.map(self._fetch_page, [self._page_range(n) for n in wave])
+                for number, data in zip(wave, pages):
+                    if self._past_end(number):
+                        return
+                    self._store_page(number, self._build(data))
+        finally:
+            pool.close()
+            pool.join()
+
+    def _reset(self, items=None):
+        """ Forgets every cached result. When the stream's whole contents are
+            known, pass them as `items` to cache them instead.
+        """
+        self._pages = {}
+        self._last_page = None
+        self._count = None
+        if items is not None:
+            size = self.MAX_PAGE_SIZE
+            for number in xrange(len(items) // size + 1):
+                self._pages[number] = items[number * size:(number + 1) * size]
+            self._last_page = len(items) // size
+            self._count = len(items)
+
+    def _store_page(self, number, page):
+        self._pages[number] = page
+        if len(page) < self._page_range(number)[1]:
+            if self._last_page is None or number < self._last_page:
+                self._last_page = number
+
+    def _past_end(self, number):
+        """ Whether page `number` is known to hold no results """
+        start = number * self.MAX_PAGE_SIZE
+        return (start >= self.MAX_RESULTS or
+                (self._count is not None and start >= self._count) or
+                (self._last_page is not None and number > self._last_page))
+
+    def _page_range(self, number):
+        """ The (start-index, max-results) of page `number` """
+        start = number * self.MAX_PAGE_SIZE
+        return start + 1, min(self.MAX_PAGE_SIZE, self.MAX_RESULTS - start)
+
+    def _fetch_page(self, page):
+        """ Requests a single page, given as a (start-index, max-results)
+            tuple, and returns the undecoded API response.
+        """
+        return self.client._gdata_json(self.uri, self._page_query(*page), alt=self.format)
+
+    def _page_query(self, index, size):
+        query = self.query.copy()
+        query.update({
+            'max-results': size,
+            'start-index': index,
+            'v': 2
+        })
+        if self.fields:
+            query['fields'] = self._feed_fields(self.fields)
+        return query
+
+    def _feed_fields(self, fields):
+        """ Wraps an entry selector into one for the whole feed, keeping the
+            total result count that pagination relies on.
+        """
+        if self.format == 'jsonc':
+            return 'totalItems,items(%s)' % (fields,)
+        return 'openSearch:totalResults,entry(%s)' % (fields,)
+
+    def _stream_page(self, number):
+        """ Fetches page `number`, yielding each result as soon as it has
+            been read off the wire. The page is cached once it has been read
+            to the end.
+        """
+        parser = self.client._gdata_json_stream(
+            self.uri, self._page_query(*self._page_range(number)), alt=self.format)
+        page = []
+        for entry in parser:
+            item = self._handle_entry(entry)
+            page.append(item)
+            yield item
+        self._handle_feed(parser.document)
+        self._store_page(number, page)
+
+    def _evict(self, number):
+        """ Drops cached pages before page `number`, so that once it has been
+            fetched no more than `window` pages are kept.
+        """
+        if self.window is None:
+            return
+        oldest = number - max(0, self.window - 1)
+        for cached in [n for n in self._pages if n < oldest]:
+            del self._pages[cached]
+
+    def _build(self, data):
+        """ Hands a page to _handle_data, timing it when the client keeps
+            metrics.
+        """
+        metrics = self.client.metrics
+        if metrics is None:
+            return self._handle_data(data)
+        started = time.time()
+        items = self._handle_data(data)
+        metrics.observe(self.client._endpoint(self.uri), 'build', time.time() - started)
+        return items
 
     def _handle_data(self, data):
+        """ Turns a page of API results into a list of objects.
+
+            By default this hands the feed to _handle_feed, and each of its
+            entries to _handle_entry.
+        """
+        self._handle_feed(data)
+        return [self._handle_entry(entry) for entry in self._entries(data)]
+
+    def _entries(self, data):
+        """ The raw entries on a page of API results """
+        if self.format == 'jsonc':
+            return data[u'data'].get(u'items', ())
+        return data[u'feed'].get(u'entry', ())
+
+    def _handle_feed(self, data):
+        """ Left to subclasses to implement.
+
+            Receives a page of API results; well behaved stream classes
+            should update self._count here. When streaming a page this is
+            called after the entries have been handled, and the entries are
+            left out of data.
+        """
+        raise NotImplementedError
+
+    def _handle_entry(self, entry):
         """ Left to subclasses to implement.
 
-            Well behaved stream classes should update self._count when
-            overriding this method.
+            Turns a single feed entry into the object the stream returns.
         """
-        raise NotImplemented
+        raise NotImplementedError
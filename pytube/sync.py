@@ -0,0 +1,209 @@
+try: import sqlite3
+except ImportError: sqlite3 = None
+import os
+import threading
+
+from pytube.utils import yt_ts_to_datetime
+
+
+def _format_ts(dt):
+    """ Formats a naive UTC datetime as a youtube timestamp """
+    return dt.strftime('%Y-%m-%dT%H:%M:%S.') + '%03dZ' % (dt.microsecond // 1000)
+
+
+class MemoryWatermarkStore(object):
+    """ Keeps watermarks in memory, for as long as the process runs.
+
+        Watermark stores map a feed key to the datetime of the most recent
+        update seen in that feed; `get` returns None for feeds never synced.
+    """
+
+    def __init__(self):
+        self._watermarks = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            return self._watermarks.get(key)
+
+    def set(self, key, watermark):
+        with self._lock:
+            self._watermarks[key] = watermark
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+class FileWatermarkStore(MemoryWatermarkStore):
+    """ Keeps watermarks in a file at `path`.
+
+        Every change is appended to the file as a single line, so syncing
+        thousands of feeds doesn't rewrite it thousands of times; the file
+        is compacted when it is opened, once it holds more than twice as
+        many lines as feeds.
+    """
+
+    def __init__(self, path):
+        MemoryWatermarkStore.__init__(self)
+        self.path = path
+        lines = 0
+        if os.path.exists(path):
+            with open(path) as fp:
+                for line in fp:
+                    key, sep, timestamp = line.rstrip('\n').rpartition('\t')
+                    if not sep:
+                        # a line cut short by a crash
+                        continue
+                    self._watermarks[key.decode('utf-8')] = yt_ts_to_datetime(timestamp)
+                    lines += 1
+        if lines > 2 * len(self._watermarks):
+            self._compact()
+
+    def set(self, key, watermark):
+        with self._lock:
+            self._watermarks[key] = watermark
+            with open(self.path, 'a') as fp:
+                fp.write(self._line(key, watermark))
+
+    def _line(self, key, watermark):
+        return '%s\t%s\n' % (key.encode('utf-8'), _format_ts(watermark))
+
+    def _compact(self):
+        temp = self.path + '.tmp'
+        with open(temp, 'w') as fp:
+            for key, watermark in self._watermarks.iteritems():
+                fp.write(self._line(key, watermark))
+        os.rename(temp, self.path)
+
+
+class SQLiteWatermarkStore(object):
+    """ Keeps watermarks in a table of the SQLite database at `path` """
+
+    def __init__(self, path, table='pytube_watermarks'):
+        if sqlite3 is None:
+            raise ImportError("SQLiteWatermarkStore requires the sqlite3 module")
+        self.path = path
+        self.table = table
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS %s (feed TEXT PRIMARY KEY, updated TEXT NOT NULL)' % table)
+
+    def get(self, key):
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT updated FROM %s WHERE feed = ?' % self.table, (key,)).fetchone()
+        return yt_ts_to_datetime(row[0]) if row else None
+
+    def set(self, key, watermark):
+        with self._lock:
+            with self._connection:
+                self._connection.execute(
+                    'INSERT OR REPLACE INTO %s (feed, updated) VALUES (?, ?)' % self.table,
+                    (key, _format_ts(watermark)))
+
+    def close(self):
+        self._connection.close()
+
+
+class Sync(object):
+    """ Reads only what changed in video feeds since they were last synced.
+
+        For every feed, `store` keeps the time of the most recent update
+        seen in it (see MemoryWatermarkStore, FileWatermarkStore and
+        SQLiteWatermarkStore). Feeds are then asked only for the videos
+        updated since then, so an unchanged feed costs a single short
+        request.
+    """
+
+    def __init__(self, client, store=None):
+        self.client = client
+        self.store = store if store is not None else MemoryWatermarkStore()
+
+    def uploads(self, username):
+        """ Yields the videos uploaded or changed in `username`'s channel
+            since it was last synced. See updates.
+        """
+        return self.updates(self.client.user_videos(username))
+
+    def updates(self, stream):
+        """ Yields the videos in VideoStream `stream` that are new or have
+            been updated since it was last synced; every video the first
+            time a feed is synced.
+
+            A feed only pages through its first MAX_RESULTS videos, newest
+            published first; when more than that many have been updated,
+            the older ones are read by asking again for videos published
+            before the oldest one read so far.
+
+            The feed's watermark is only moved on once every update has been
+            yielded, so a sync that is stopped (or fails, or can't page
+            through every update) part way is simply repeated next time.
+        """
+        key = self._key(stream)
+        # an AsyncClient's streams wrap the Stream whose class we build on
+        base = getattr(stream, '_stream', stream)
+        watermark = self.store.get(key)
+        query = dict(stream.query)
+        query.setdefault('orderby', 'published')
+        if watermark is not None:
+            query['updated-min'] = _format_ts(watermark)
+        latest = watermark
+        # (published, ids) of the oldest videos read by the last request,
+        # which the next one, asking for videos published up to then, repeats
+        boundary = None
+        while 1:
+            feed = type(base)(base.client, base.uri, query=dict(query), window=1,
+                              fields=base.fields, format=base.format)
+            oldest, at_oldest = None, set()
+            new = 0
+            for video in feed:
+                published = getattr(video, 'published', None)
+                if published is not None:
+                    if oldest is None or published < oldest:
+                        oldest, at_oldest = published, set()
+                    if published == oldest:
+                        at_oldest.add(video.id)
+                if boundary is not None and published == boundary[0] and video.id in boundary[1]:
+                    continue
+                new += 1
+                updated = getattr(video, 'updated', None)
+                if watermark is not None and updated is not None and updated <= watermark:
+                    # updated-min is inclusive; the feed isn't ordered by
+                    # update, so there may be newer updates further on
+                    continue
+                if updated is not None and (latest is None or updated > latest):
+                    latest = updated
+                yield video
+            if feed.count <= feed.MAX_RESULTS:
+                break
+            if oldest is None or not new:
+                # no way to page further; leave the watermark alone so that
+                # nothing is skipped
+                return
+            if boundary is not None and boundary[0] == oldest:
+                at_oldest |= boundary[1]
+            boundary = oldest, at_oldest
+            query['published-max'] = _format_ts(oldest)
+        if latest is not None and latest != watermark:
+            self.store.set(key, latest)
+
+    def poll(self, usernames):
+        """ Syncs the uploads of every user in `usernames` in turn, yielding
+            a (username, video) tuple for every new or changed video.
+        """
+        for username in usernames:
+            for video in self.uploads(username):
+                yield username, video
+
+    def _key(self, stream):
+        query = '&'.join('%s=%s' % item for item in sorted(stream.query.iteritems())
+                         if item[0] not in ('updated-min', 'published-max'))
+        return stream.uri + ('?' + query if query else '')
@@ -1,17 +1,114 @@
 import datetime
 import urlparse
 
+_interned = {}
+_INTERNED_SIZE = 10000
+
+def intern_string(s):
+    """ Returns a canonical copy of s.
+
+        Values that repeat across many objects (authors, categories,
+        keywords) can share a single string instead of each object holding
+        its own copy. Unlike the intern builtin this works for unicode.
+    """
+    canonical = _interned.get(s)
+    if canonical is None:
+        if len(_interned) >= _INTERNED_SIZE:
+            _interned.clear()
+        canonical = _interned[s] = s
+    return canonical
+
+
+class Slotted(object):
+    """ Base for compact model classes that keep their attributes in
+        __slots__ instead of a per-instance __dict__.
+
+        Provides pickle support, which slotted classes don't get for free.
+        Unset slots are left out of the pickled state.
+    """
+    __slots__ = ()
+
+    def __getstate__(self):
+        state = {}
+        for cls in type(self).__mro__:
+            for name in cls.__dict__.get('__slots__', ()):
+                if name == '__weakref__':
+                    continue
+                try:
+                    # go through the slot descriptor so unset slots don't
+                    # fall back on the class's __getattr__
+                    state[name] = cls.__dict__[name].__get__(self, cls)
+                except AttributeError:
+                    pass
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.iteritems():
+            setattr(self, name, value)
+
+
+_ts_cache = {}
+_TS_CACHE_SIZE = 10000
+
 def yt_ts_to_datetime(yt_ts):
-    """ Converts a youtube timestamp into a python datetime object.
+    """ Converts a youtube timestamp (eg. 2011-04-22T12:01:19.000Z) into a
+        python datetime object.
 
-        Note that these datetimes are PST or PDT.
-        TODO: Figure out a reasonable way to handle timezone data.
+        Fractional seconds are kept, to the microsecond. Timestamps with a
+        UTC offset are converted to UTC; the returned datetime is naive.
+        Decoded timestamps are memoized, since feeds repeat them a lot.
     """
-    dt = datetime.datetime.strptime(yt_ts[:19], '%Y-%m-%dT%H:%M:%S')
-    dt = dt.replace(microsecond=int(yt_ts[20:22]))
+    dt = _ts_cache.get(yt_ts)
+    if dt is None:
+        dt = _parse_yt_ts(yt_ts)
+        if len(_ts_cache) >= _TS_CACHE_SIZE:
+            _ts_cache.clear()
+        _ts_cache[yt_ts] = dt
     return dt
 
 
+def yt_ts_to_datetimes(yt_timestamps):
+    """ Converts a list of youtube timestamps into a list of datetimes,
+        decoding each distinct timestamp only once.
+    """
+    decoded = {}
+    for yt_ts in yt_timestamps:
+        if yt_ts not in decoded:
+            decoded[yt_ts] = yt_ts_to_datetime(yt_ts)
+    return [decoded[yt_ts] for yt_ts in yt_timestamps]
+
+
+def _parse_yt_ts(yt_ts):
+    # youtube timestamps have a fixed layout, so slicing them up is much
+    # cheaper than going through strptime.
+    if (len(yt_ts) < 19 or yt_ts[4] != '-' or yt_ts[7] != '-' or
+        yt_ts[10] not in 'Tt ' or yt_ts[13] != ':' or yt_ts[16] != ':'):
+        raise ValueError("Not a youtube timestamp: %r" % (yt_ts,))
+    dt = datetime.datetime(
+        int(yt_ts[0:4]), int(yt_ts[5:7]), int(yt_ts[8:10]),
+        int(yt_ts[11:13]), int(yt_ts[14:16]), int(yt_ts[17:19]))
+
+    rest = yt_ts[19:]
+    if rest[:1] == '.':
+        end = 1
+        while end < len(rest) and rest[end].isdigit():
+            end += 1
+        if end == 1:
+            raise ValueError("Not a youtube timestamp: %r" % (yt_ts,))
+        dt = dt.replace(microsecond=int(rest[1:end][:6].ljust(6, '0')))
+        rest = rest[end:]
+
+    if rest in ('', 'Z', 'z'):
+        return dt
+    offset = rest[1:].replace(':', '')
+    if rest[0] not in '+-' or len(offset) not in (2, 4) or not offset.isdigit():
+        raise ValueError("Not a youtube timestamp: %r" % (yt_ts,))
+    offset = datetime.timedelta(hours=int(offset[:2]), minutes=int(offset[2:] or 0))
+    if rest[0] == '+':
+        return dt - offset
+    return dt + offset
+
+
 def video_id_from_youtube_url(url):
     """ Transforms a youtube url into the youtube video id.
 